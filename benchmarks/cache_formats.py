@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Module: cache_formats
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Size and read time of the cached feed pages per payload format of the cache store: plain text as stored by the
+schema version 1 and zlib at several levels. The read covers the query, the decompression and the decoding of
+the response entry and of the feed json, as done by YandexZen.request.
+
+    python benchmarks/cache_formats.py [--pages 200] [--items 30] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCHMARKS_PATH, "stubs"), os.path.dirname(BENCHMARKS_PATH)]
+
+from benchmarks.replay_server import load_fixture  # noqa: E402
+from resources.lib import cachestore  # noqa: E402
+from resources.lib.cachestore import CacheStore  # noqa: E402
+from resources.lib.httpcache import ResponseCache  # noqa: E402
+
+# format name, min size to compress or None to store as text, zlib level
+FORMATS = [("text", None, 0),
+           ("zlib 1", cachestore.COMPRESS_MIN_SIZE, 1),
+           ("zlib 6", cachestore.COMPRESS_MIN_SIZE, 6),
+           ("zlib 9", cachestore.COMPRESS_MIN_SIZE, 9)]
+
+URL = "https://dzen.ru/api/v3/launcher/video-more?country_code=ru&page=%d"
+
+WORDS = ("видео", "новости", "канал", "обзор", "как", "сделать", "своими", "руками", "рецепт", "путешествие",
+         "video", "review", "music", "live", "best", "moments", "2026", "часть", "выпуск", "интервью")
+
+
+class FakeResponse(object):
+
+    def __init__(self, text):
+        self.text = text
+        self.headers = {'ETag': '"0123456789abcdef"'}
+
+
+def create_element(element, index, rnd):
+    """
+    Copy of the fixture element with the unique fields of a real feed, so that the pages compress as real ones
+    """
+    title = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(4, 12)))
+    return dict(element,
+                id="%s-%d" % (element['id'], index),
+                title=title.capitalize(),
+                text=" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(10, 40))),
+                publisher_id="%024x" % rnd.getrandbits(96),
+                views=rnd.randint(0, 10 ** 6),
+                image="%s?token=%032x" % (element['image'], rnd.getrandbits(128)))
+
+
+def create_pages(count, items):
+    rnd = random.Random(0)
+    feed = load_fixture("video-more.json").replace("{base}", "https://dzen.ru")
+    pages = []
+    for page in range(count):
+        data = json.loads(feed.replace("{page}", str(page)).replace("{next}", URL % (page + 1)))
+        elements = data['items']
+        data['items'] = [create_element(elements[i % len(elements)], i, rnd) for i in range(items)]
+        pages.append(json.dumps(data, ensure_ascii=False))
+    return pages
+
+
+def measure(pages, min_size, level, repeat):
+    cachestore.COMPRESS_MIN_SIZE = min_size if min_size is not None else float("inf")
+    cachestore.COMPRESS_LEVEL = level
+    path = tempfile.mkdtemp(prefix="zen_cache_")
+    try:
+        store = CacheStore(os.path.join(path, "cache.db"))
+        cache = ResponseCache(store)
+        started = time.perf_counter()
+        for i, page in enumerate(pages):
+            cache.put(URL % i, FakeResponse(page))
+        write_ms = (time.perf_counter() - started) * 1000 / len(pages)
+        size = store.db.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+
+        reads = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for i in range(len(pages)):
+                json.loads(cache.get(URL % i)['content'])
+            reads.append((time.perf_counter() - started) * 1000 / len(pages))
+        store.close()
+        return size / len(pages), write_ms, statistics.median(reads)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--items", type=int, default=30, help="feed elements per page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = create_pages(args.pages, args.items)
+    print("%d pages of %.1f KB" % (len(pages), statistics.mean(len(p.encode("utf-8")) for p in pages) / 1024))
+    print("%-8s %10s %12s %12s" % ("format", "KB/page", "write ms", "read ms"))
+    for name, min_size, level in FORMATS:
+        size, write_ms, read_ms = measure(pages, min_size, level, args.repeat)
+        print("%-8s %10.2f %12.3f %12.3f" % (name, size / 1024, write_ms, read_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Module: child
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Single plugin invocation started by the harness: python child.py <addon path> <query>
+Prints the timings in milliseconds from the process start, the peak memory and the listing as a json line.
+"""
+import time
+
+STARTED = time.monotonic()
+
+import io  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import resource  # noqa: E402
+import sys  # noqa: E402
+
+from contextlib import redirect_stdout  # noqa: E402
+
+
+def since_start(moment):
+    return round((moment - STARTED) * 1000, 1) if moment else None
+
+
+def main():
+    tree, query = sys.argv[1], sys.argv[2]
+    sys.argv = ["plugin://plugin.video.yandex.zen/", "1", query]
+
+    import xbmc
+    import xbmcplugin
+
+    # the addon modules main.py starts with, timed separately from the invocation itself
+    import resources.lib.yandexzen  # noqa: F401
+    import resources.lib.users  # noqa: F401
+    imported = time.monotonic()
+
+    # executed in place of runpy.run_path, which replaces sys.argv[0] with the script path
+    script = os.path.join(tree, "main.py")
+    with open(script, encoding="utf-8") as f:
+        code = compile(f.read(), script, "exec")
+    with redirect_stdout(io.StringIO()):
+        exec(code, {'__name__': "__main__", '__file__': script})
+    finished = time.monotonic()
+
+    print(json.dumps({'import_ms': since_start(imported),
+                      'end_of_directory_ms': since_start(xbmcplugin.EVENTS.get('end_of_directory')),
+                      'resolved_ms': since_start(xbmcplugin.EVENTS.get('resolved')),
+                      'total_ms': since_start(finished),
+                      'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                      'modules': sorted(sys.modules),
+                      'items': [[url, item.label, is_folder] for url, item, is_folder in xbmcplugin.ITEMS],
+                      'resolved': xbmcplugin.RESOLVED,
+                      'builtins': xbmc.BUILTINS}))
+
+
+if __name__ == '__main__':
+    main()
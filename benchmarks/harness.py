@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Module: harness
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Runs the plugin invocations the way Kodi does: every one of them is a new python process executing main.py with
+the plugin url, handle and query in sys.argv. The xbmc modules are replaced with the stubs of benchmarks/stubs.
+"""
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+ADDON_PATH = os.path.dirname(BENCHMARKS_PATH)
+STUBS_PATH = os.path.join(BENCHMARKS_PATH, "stubs")
+PLUGIN_URL = "plugin://plugin.video.yandex.zen/"
+
+
+def get_env(profile, settings=None, folder="", keyboard="", tree=ADDON_PATH):
+    """
+    @param profile: addon profile directory, shared by the invocations of a scenario
+    @param settings: dict of the settings overriding the defaults of resources/settings.xml
+    @param folder: Container.FolderPath shown by Kodi
+    @param keyboard: text entered with the keyboard
+    @param tree: addon directory to run main.py from
+    """
+    env = dict(os.environ)
+    env.update(PYTHONPATH=os.pathsep.join([STUBS_PATH, tree]),
+               PYTHONDONTWRITEBYTECODE="",
+               BENCH_PROFILE=profile,
+               BENCH_SETTINGS=json.dumps(settings or {}),
+               BENCH_FOLDER=folder,
+               BENCH_KEYBOARD=keyboard)
+    return env
+
+
+def start(query, profile, settings=None, folder="", keyboard="", tree=ADDON_PATH):
+    """
+    Starts the plugin invocation without waiting for it
+    @param query: plugin query starting with ?
+    @return: subprocess.Popen printing the result of the invocation as json
+    """
+    return subprocess.Popen([sys.executable, os.path.join(BENCHMARKS_PATH, "child.py"), tree, query],
+                            cwd=tree,
+                            env=get_env(profile, settings, folder or PLUGIN_URL + query, keyboard, tree),
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+
+
+def finish(process, timeout=120):
+    out, err = process.communicate(timeout=timeout)
+    if process.returncode:
+        raise RuntimeError("Plugin invocation failed:\n%s" % err.decode("utf-8", "replace"))
+    return json.loads(out.decode("utf-8").strip().splitlines()[-1])
+
+
+def invoke(query, profile, settings=None, folder="", keyboard="", tree=ADDON_PATH):
+    """
+    Runs the plugin invocation in a new process
+    @return: dict with import_ms, end_of_directory_ms, resolved_ms, total_ms, max_rss_kb, modules, items, resolved
+    and builtins of the invocation
+    """
+    return finish(start(query, profile, settings, folder, keyboard, tree))
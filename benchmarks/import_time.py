@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Module: import_time
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Cold start benchmark of the plugin invocations per context: the time to import the modules main.py starts with,
+the time to complete the invocation and the heavy modules it has loaded.
+
+    python benchmarks/import_time.py [--repeat 10] [--tree PATH] [--before PATH]
+
+To compare with an earlier revision, check it out next to the working tree and pass it as --before:
+
+    git worktree add /tmp/before <revision>
+    python benchmarks/import_time.py --before /tmp/before
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness  # noqa: E402
+from benchmarks.replay_server import ReplayServer  # noqa: E402
+
+# the online contexts run against the replay server with a warm cache, so that the network is not measured
+CONTEXTS = [("home", "?"),
+            ("favorites", "?action=favorites&context=home"),
+            ("searches", "?action=load&context=searches"),
+            ("search_local", "?action=search_local&context=searches&search=kodi"),
+            ("videos", "?action=load&context=videos&content=videos"),
+            ("news", "?action=load&context=news&content=videos")]
+
+# modules, which the offline actions should not load
+HEAVY_MODULES = ("requests", "urllib3", "sqlite3", "concurrent.futures", "socketserver", "email.message",
+                 "http.client", "resources.lib.httpservice", "resources.lib.warmup")
+
+
+def measure(tree, replay, repeat):
+    results = {}
+    profile = tempfile.mkdtemp(prefix="zen_import_")
+    settings = {'site_url': replay.url}
+    try:
+        # fills the cache of the online contexts
+        for name, query in CONTEXTS:
+            harness.invoke(query, profile, settings=settings, tree=tree)
+        for name, query in CONTEXTS:
+            runs = [harness.invoke(query, profile, settings=settings, tree=tree) for _ in range(repeat)]
+            results[name] = {'import_ms': statistics.median(r['import_ms'] for r in runs),
+                             'total_ms': statistics.median(r['total_ms'] for r in runs),
+                             'heavy': [m for m in HEAVY_MODULES if m in runs[-1]['modules']]}
+    finally:
+        shutil.rmtree(profile, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--tree", default=harness.ADDON_PATH, help="addon directory to benchmark")
+    parser.add_argument("--before", help="addon directory of the revision to compare with")
+    args = parser.parse_args()
+
+    with ReplayServer() as replay:
+        after = measure(args.tree, replay, args.repeat)
+        before = measure(args.before, replay, args.repeat) if args.before else None
+
+    for name, query in CONTEXTS:
+        line = "%-13s import %6.1f ms  total %6.1f ms" % (name, after[name]['import_ms'], after[name]['total_ms'])
+        if before:
+            line += "  (before: import %6.1f ms  total %6.1f ms)" % (before[name]['import_ms'],
+                                                                   before[name]['total_ms'])
+        print(line)
+        print("%-13s loaded: %s" % ("", ", ".join(after[name]['heavy']) or "-"))
+        if before:
+            print("%-13s before: %s" % ("", ", ".join(before[name]['heavy']) or "-"))
+
+
+if __name__ == '__main__':
+    main()
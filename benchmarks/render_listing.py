@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Module: render_listing
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Micro-benchmark of Page.show_list_items rendering a large video listing with the stub xbmc modules, compared
+with the per-item addDirectoryItem loop it has replaced.
+
+    python benchmarks/render_listing.py [--items 500] [--repeat 20] [--kodi 20]
+
+Only the python side is measured, the calls into Kodi cost nothing with the stubs, so their number is reported
+along with the time.
+"""
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCHMARKS_PATH, "stubs"), os.path.dirname(BENCHMARKS_PATH)]
+os.environ.setdefault("BENCH_PROFILE", tempfile.mkdtemp(prefix="zen_render_"))
+
+import xbmc  # noqa: E402
+import xbmcgui  # noqa: E402
+import xbmcplugin  # noqa: E402
+
+from benchmarks.replay_server import load_fixture  # noqa: E402
+
+QUERY = "?action=load&context=videos&content=videos"
+
+
+def legacy_show_list_items(page):
+    """
+    show_list_items before the listing has been submitted in one call
+    """
+    xbmcplugin.setPluginCategory(page.site.handle, page.site.context_title)
+    xbmcplugin.setContent(page.site.handle, page.params['content'] if "content" in page.params else "videos")
+
+    for category in page.list_items:
+        if category['label'] == "":
+            continue
+        list_item = xbmcgui.ListItem(label=category['label'])
+        list_item.setProperty('IsPlayable', str(category['is_playable']).lower())
+
+        if page.cache_enabled:
+            page.context_menu_items = [(page.site.language(30001),
+                                        "ActivateWindow(Videos, %s&refresh=true)" % page.get_nav_url(offset=0)), ]
+        else:
+            page.context_menu_items.clear()
+        page.add_context_menu(category)
+        if page.context_menu_items:
+            list_item.addContextMenuItems(page.context_menu_items)
+
+        if 'info' in category:
+            list_item.setInfo(category['type'] if 'type' in category else "video", category['info'])
+        if 'art' in category:
+            list_item.setArt(category['art'])
+        if 'cast' in category:
+            list_item.setCast(category['cast'])
+
+        xbmcplugin.addDirectoryItem(page.site.handle, category['url'], list_item, category['is_folder'])
+
+    xbmcplugin.endOfDirectory(page.site.handle, cacheToDisc=False)
+
+
+class CallCounter(object):
+    """
+    Counts the calls into the xbmcplugin module and to the list items
+    """
+
+    def __init__(self):
+        self.count = 0
+        for name in ("setPluginCategory", "setContent", "addDirectoryItem", "addDirectoryItems", "endOfDirectory"):
+            setattr(xbmcplugin, name, self.wrap(getattr(xbmcplugin, name)))
+        for name in ("setProperty", "setArt", "setInfo", "setCast", "addContextMenuItems", "getVideoInfoTag"):
+            setattr(xbmcgui.ListItem, name, self.wrap(getattr(xbmcgui.ListItem, name)))
+        xbmcgui.ListItem.__init__ = self.wrap(xbmcgui.ListItem.__init__)
+        get_setter = xbmcgui.InfoTagVideo.__getattr__
+        xbmcgui.InfoTagVideo.__getattr__ = lambda tag, name: self.wrap(get_setter(tag, name))
+
+    def wrap(self, function):
+        @functools.wraps(function)
+        def counted(*args, **kwargs):
+            self.count += 1
+            return function(*args, **kwargs)
+        return counted
+
+
+def create_page(count):
+    sys.argv = ["plugin://plugin.video.yandex.zen/", "1", QUERY]
+
+    from resources.lib.yandexzen import YandexZen
+    from resources.lib.modules.videos import Video
+
+    site = YandexZen()
+    site.parse_params()
+    page = Video(site)
+
+    feed = load_fixture("video-more.json").replace("{base}", "http://127.0.0.1").replace("{next}", "")
+    elements = []
+    while len(elements) < count:
+        elements.extend(json.loads(feed.replace("{page}", str(len(elements))))['items'])
+    page.list_items = [page.create_element_li(element) for element in elements[:count]]
+    return page
+
+
+def measure(render, page, repeat, counter):
+    times = []
+    for _ in range(repeat):
+        xbmcplugin.ITEMS.clear()
+        counter.count = 0
+        started = time.perf_counter()
+        render(page)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), len(xbmcplugin.ITEMS), counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--kodi", default="20", help="major Kodi version, 19 sets the info labels with setInfo")
+    args = parser.parse_args()
+
+    build_version = "%s.0 Git:bench" % args.kodi
+    get_info_label = xbmc.getInfoLabel
+    xbmc.getInfoLabel = lambda label: build_version if label == "System.BuildVersion" else get_info_label(label)
+
+    counter = CallCounter()
+    page = create_page(args.items)
+    # the artwork is not downloaded, the listing points to the remote urls
+    page.site.artwork.prefetch = lambda urls: None
+
+    for name, render, artwork_cache in (("legacy", legacy_show_list_items, False),
+                                        ("current", type(page).show_list_items, False),
+                                        ("current, artwork cache", type(page).show_list_items, True)):
+        # the artwork cache looks up the local copy of every image of the listing
+        page.site.artwork.enabled = artwork_cache
+        ms, items, calls = measure(render, page, args.repeat, counter)
+        print("%-24s %5d items %8.2f ms %7.1f us/item %6d calls into Kodi" % (name, items, ms, ms * 1000 / items,
+                                                                            calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Module: replay_server
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Local http server replaying the recorded responses of the site from benchmarks/fixtures. The launcher feeds are
+paginated with the page parameter of their more link, the responses carry an ETag and are revalidated with 304.
+"""
+import os
+import threading
+import time
+import zlib
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit, urlencode
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# number of the pages of each launcher feed
+PAGES = 20
+
+# 1x1 jpeg for the artwork requests
+JPEG = bytes.fromhex("ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c19"
+                     "12130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b08"
+                     "0001000101011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b51000"
+                     "02010303020403050504040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f0"
+                     "2433627282090a161718191a25262728292a3435363738393a434445464748494a535455565758595a636465666768"
+                     "696a737475767778797a838485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3"
+                     "c4c5c6c7c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fb"
+                     "d3ffd9")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_PATH, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class ReplayServer(object):
+    """
+    @param delay: seconds to wait before answering the api requests, to keep the concurrent invocations in flight
+    """
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        # http status of the api responses, set to 500 or 503 to replay a failing site
+        self.status = 200
+        self.hits = []
+        self.lock = threading.Lock()
+        self.fixtures = {name: load_fixture(name) for name in os.listdir(FIXTURES_PATH)}
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.create_handler())
+        self.httpd.daemon_threads = True
+        self.url = "http://127.0.0.1:%d" % self.httpd.server_address[1]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def record(self, path):
+        with self.lock:
+            self.hits.append(path)
+
+    def get_hits(self, prefix=""):
+        with self.lock:
+            return [path for path in self.hits if path.startswith(prefix)]
+
+    def reset(self):
+        with self.lock:
+            self.hits = []
+
+    def render_feed(self, name, query):
+        page = int(query.get('page', ["0"])[0])
+        query['page'] = [str(page + 1)]
+        next_url = "%s%s?%s" % (self.url, query.pop('_path')[0], urlencode(query, doseq=True)) \
+            if page + 1 < PAGES else ""
+        return self.fixtures[name].replace("{base}", self.url).replace("{page}", str(page)).replace("{next}", next_url)
+
+    def create_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body=b"", content_type="application/json", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                server.record(self.path)
+                split = urlsplit(self.path)
+                path = split.path
+
+                if path.startswith("/img/"):
+                    self.send(200, JPEG, "image/jpeg")
+                elif path == "/video":
+                    self.send(200, b"<html></html>", "text/html",
+                              {'Set-Cookie': "_yasc=replay; Path=/; Max-Age=86400"})
+                elif path.startswith("/video/"):
+                    name = "master.m3u8" if path.endswith("/master.m3u8") else "variant.m3u8"
+                    self.send(200, self.render_playlist(name), "application/vnd.apple.mpegurl")
+                elif path.startswith("/api/v3/launcher/"):
+                    self.send_feed(split, path)
+                else:
+                    self.send(404)
+
+            def render_playlist(self, name):
+                return server.fixtures[name].encode("utf-8")
+
+            def send_feed(self, split, path):
+                if server.delay:
+                    time.sleep(server.delay)
+                if server.status != 200:
+                    self.send(server.status)
+                    return
+                name = "%s.json" % path.rsplit("/", 1)[1]
+                if name not in server.fixtures:
+                    self.send(404)
+                    return
+                query = parse_qs(split.query)
+                query['_path'] = [path]
+                body = server.render_feed(name, query).encode("utf-8")
+                etag = '"%08x"' % zlib.crc32(body)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send(304, headers={'ETag': etag})
+                else:
+                    self.send(200, body, headers={'ETag': etag, 'Cache-Control': "max-age=60"})
+
+        return Handler
+
+
+if __name__ == '__main__':
+    with ReplayServer() as replay:
+        print("Replaying %s on %s" % (FIXTURES_PATH, replay.url))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Module: run
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Startup, listing, pagination and memory benchmark of the plugin invocations against the replay server.
+
+    python benchmarks/run.py [--repeat 5] [--tree PATH] [--json]
+
+Every scenario runs in a fresh profile, the warm runs reuse the profile of the cold one. The medians of the
+repeats are reported in milliseconds from the start of the python process.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness  # noqa: E402
+from benchmarks.replay_server import ReplayServer  # noqa: E402
+
+# name, query or None for the next page of the previous listing, True to start every run with an empty profile
+SCENARIOS = [("home", "?", True),
+             ("videos", "?action=load&context=videos&content=videos", True),
+             ("videos warm", "?action=load&context=videos&content=videos", False),
+             ("pagination", None, False),
+             ("search", "?action=search&context=videos&content=videos&search=kodi", True),
+             ("play", "?action=play&context=videos&spath={base}/video/more-0-00/master.m3u8", True)]
+
+METRICS = ("import_ms", "end_of_directory_ms", "resolved_ms", "total_ms", "max_rss_kb")
+
+
+def get_next_page_query(result):
+    """
+    @return: query of the next page folder of the listing, None if there is no next page
+    """
+    for url, label, is_folder in result['items']:
+        if is_folder and "load_url=" in url:
+            return url[len(harness.PLUGIN_URL):]
+    return None
+
+
+def run_scenario(replay, name, query, cold, profile, tree, repeat, last):
+    results = []
+    for _ in range(repeat):
+        if cold:
+            shutil.rmtree(profile, ignore_errors=True)
+        if query is None:
+            query = get_next_page_query(last)
+            if query is None:
+                raise RuntimeError("The listing has no next page")
+        replay.reset()
+        result = harness.invoke(query.replace("{base}", replay.url), profile,
+                                settings={'site_url': replay.url}, tree=tree)
+        result['requests'] = len(replay.get_hits("/api/"))
+        results.append(result)
+    return results
+
+
+def summarize(name, results):
+    summary = {'scenario': name,
+               'items': len(results[-1]['items']),
+               'requests': results[-1]['requests']}
+    for metric in METRICS:
+        values = [r[metric] for r in results if r[metric] is not None]
+        summary[metric] = statistics.median(values) if values else None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tree", default=harness.ADDON_PATH, help="addon directory to benchmark")
+    parser.add_argument("--json", action="store_true", help="print the results as json")
+    args = parser.parse_args()
+
+    profile_root = tempfile.mkdtemp(prefix="zen_bench_")
+    summaries = []
+    try:
+        with ReplayServer() as replay:
+            profile, last = None, None
+            for name, query, cold in SCENARIOS:
+                if cold or profile is None:
+                    profile = os.path.join(profile_root, name.split()[0])
+                results = run_scenario(replay, name, query, cold, profile, args.tree, args.repeat, last)
+                last = results[-1]
+                summaries.append(summarize(name, results))
+    finally:
+        shutil.rmtree(profile_root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(summaries, indent=1))
+        return
+
+    print("%-12s %6s %5s %9s %9s %9s %9s %9s" % ("scenario", "items", "reqs", "import", "listed", "resolved",
+                                                 "total", "rss kb"))
+    for s in summaries:
+        print("%-12s %6d %5d %9s %9s %9s %9s %9s" % (s['scenario'], s['items'], s['requests'],
+                                                     *(s[m] if s[m] is not None else "-" for m in METRICS)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Module: xbmc
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Fake xbmc module for running the addon outside Kodi. Configured through the environment:
+BENCH_VERBOSE=1 prints the log to stderr, BENCH_FOLDER is the Container.FolderPath, BENCH_KEYBOARD is the text
+entered with the keyboard.
+"""
+import os
+import sys
+import time
+
+LOGDEBUG = 0
+LOGINFO = 1
+LOGWARNING = 2
+LOGERROR = 3
+LOGFATAL = 4
+
+# builtins executed by the addon
+BUILTINS = []
+
+
+def log(msg, level=LOGDEBUG):
+    if os.environ.get("BENCH_VERBOSE"):
+        sys.stderr.write("%s: %s\n" % (level, msg))
+
+
+def executebuiltin(function, wait=False):
+    BUILTINS.append(function)
+
+
+def executeJSONRPC(request):  # pylint: disable=invalid-name
+    return '{"id": 1, "jsonrpc": "2.0", "result": "OK"}'
+
+
+def getInfoLabel(label):  # pylint: disable=invalid-name
+    if label == "System.BuildVersion":
+        return "20.2 (20.2.0) Git:20230629-5f418d0b13"
+    if label == "Container.FolderPath":
+        return os.environ.get("BENCH_FOLDER", "")
+    return ""
+
+
+def getCondVisibility(condition):  # pylint: disable=invalid-name
+    return False
+
+
+def getGlobalIdleTime():  # pylint: disable=invalid-name
+    return int(os.environ.get("BENCH_IDLE_TIME", "0"))
+
+
+def sleep(ms):
+    time.sleep(ms / 1000.0)
+
+
+class Monitor(object):
+
+    def abortRequested(self):  # pylint: disable=invalid-name
+        return False
+
+    def waitForAbort(self, timeout=0):  # pylint: disable=invalid-name
+        time.sleep(min(timeout or 0, 0.01))
+        return False
+
+
+class Player(object):
+
+    def isPlaying(self):  # pylint: disable=invalid-name
+        return False
+
+    def isPlayingVideo(self):  # pylint: disable=invalid-name
+        return False
+
+    def getPlayingFile(self):  # pylint: disable=invalid-name
+        return ""
+
+    def getTime(self):  # pylint: disable=invalid-name
+        raise RuntimeError("Kodi is not playing any media file")
+
+    def getTotalTime(self):  # pylint: disable=invalid-name
+        raise RuntimeError("Kodi is not playing any media file")
+
+
+class Keyboard(object):
+
+    def __init__(self, default="", heading="", hidden=False):
+        self.text = default
+
+    def setDefault(self, default):  # pylint: disable=invalid-name
+        self.text = default
+
+    def setHeading(self, heading):  # pylint: disable=invalid-name
+        pass
+
+    def doModal(self):  # pylint: disable=invalid-name
+        self.text = os.environ.get("BENCH_KEYBOARD", "")
+
+    def isConfirmed(self):  # pylint: disable=invalid-name
+        return bool(self.text)
+
+    def getText(self):  # pylint: disable=invalid-name
+        return self.text
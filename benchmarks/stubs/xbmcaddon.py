@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcaddon
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Fake xbmcaddon module. Settings default to resources/settings.xml and are overridden by the BENCH_SETTINGS JSON
+object, the addon profile is the BENCH_PROFILE directory.
+"""
+import json
+import os
+import re
+import tempfile
+
+from xml.etree import ElementTree
+
+ADDON_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_settings():
+    settings = {}
+    tree = ElementTree.parse(os.path.join(ADDON_PATH, "resources", "settings.xml"))
+    for setting in tree.iter("setting"):
+        if setting.get("id"):
+            settings[setting.get("id")] = setting.get("default", "")
+    settings.update(json.loads(os.environ.get("BENCH_SETTINGS", "{}")))
+    return settings
+
+
+def load_strings():
+    path = os.path.join(ADDON_PATH, "resources", "language", "resource.language.en_gb", "strings.po")
+    with open(path, encoding="utf-8-sig") as f:
+        return {int(string_id): text for string_id, text in
+                re.findall(r'msgctxt "#(\d+)"\nmsgid "(.*)"', f.read())}
+
+
+SETTINGS = load_settings()
+STRINGS = load_strings()
+
+
+class Addon(object):
+
+    def __init__(self, id=None):  # pylint: disable=redefined-builtin
+        self.id = id or "plugin.video.yandex.zen"
+
+    def getAddonInfo(self, key):  # pylint: disable=invalid-name
+        return {'id': self.id,
+                'path': ADDON_PATH,
+                'profile': os.environ.get("BENCH_PROFILE", os.path.join(tempfile.gettempdir(), "bench_profile")),
+                'version': "0.0.0"}.get(key, "")
+
+    def getSetting(self, key):  # pylint: disable=invalid-name
+        return SETTINGS.get(key, "")
+
+    def setSetting(self, key, value):  # pylint: disable=invalid-name
+        SETTINGS[key] = value
+
+    def getLocalizedString(self, string_id):  # pylint: disable=invalid-name
+        return STRINGS.get(string_id, "")
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcgui
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Fake xbmcgui module. Window properties are kept in the process only, so the background service is never found.
+"""
+
+_PROPERTIES = {}
+
+
+class Window(object):
+
+    def __init__(self, window_id=0):
+        self.window_id = window_id
+
+    def getProperty(self, key):  # pylint: disable=invalid-name
+        return _PROPERTIES.get((self.window_id, key), "")
+
+    def setProperty(self, key, value):  # pylint: disable=invalid-name
+        _PROPERTIES[(self.window_id, key)] = value
+
+    def clearProperty(self, key):  # pylint: disable=invalid-name
+        _PROPERTIES.pop((self.window_id, key), None)
+
+
+class InfoTagVideo(object):
+
+    def __getattr__(self, name):
+        if name.startswith("set") or name.startswith("add"):
+            return lambda *args, **kwargs: None
+        raise AttributeError(name)
+
+
+class ListItem(object):
+
+    def __init__(self, label="", label2="", path="", offscreen=False):
+        self.label = label
+        self.path = path
+        self.properties = {}
+        self.art = {}
+        self.info = {}
+        self.context_menu = []
+        self._info_tag = InfoTagVideo()
+
+    def setProperty(self, key, value):  # pylint: disable=invalid-name
+        self.properties[key] = value
+
+    def setMimeType(self, mime_type):  # pylint: disable=invalid-name
+        self.properties['mimetype'] = mime_type
+
+    def setArt(self, art):  # pylint: disable=invalid-name
+        self.art.update(art)
+
+    def setInfo(self, info_type, info):  # pylint: disable=invalid-name
+        self.info.update(info)
+
+    def setCast(self, cast):  # pylint: disable=invalid-name
+        pass
+
+    def getVideoInfoTag(self):  # pylint: disable=invalid-name
+        return self._info_tag
+
+    def addContextMenuItems(self, items, replaceItems=False):  # pylint: disable=invalid-name
+        self.context_menu.extend(items)
+
+
+class Dialog(object):
+
+    def select(self, heading, items, *args, **kwargs):
+        return 0
+
+    def textviewer(self, heading, text, usemono=False):
+        pass
+
+    def ok(self, heading, message):
+        return True
+
+    def yesno(self, heading, message, *args, **kwargs):
+        return True
+
+    def notification(self, heading, message, *args, **kwargs):
+        pass
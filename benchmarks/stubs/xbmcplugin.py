@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcplugin
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Fake xbmcplugin module recording the listing and the monotonic time it has been completed
+"""
+import time
+
+# (url, ListItem, is_folder) of the listed items
+ITEMS = []
+# url passed to setResolvedUrl
+RESOLVED = []
+# monotonic times of endOfDirectory and setResolvedUrl
+EVENTS = {}
+
+
+def setPluginCategory(handle, category):  # pylint: disable=invalid-name
+    pass
+
+
+def setContent(handle, content):  # pylint: disable=invalid-name
+    pass
+
+
+def addDirectoryItem(handle, url, listitem, isFolder=False, totalItems=0):  # pylint: disable=invalid-name
+    ITEMS.append((url, listitem, isFolder))
+    return True
+
+
+def addDirectoryItems(handle, items, totalItems=0):  # pylint: disable=invalid-name
+    ITEMS.extend(items)
+    return True
+
+
+def endOfDirectory(handle, succeeded=True, updateListing=False, cacheToDisc=True):  # pylint: disable=invalid-name
+    EVENTS['end_of_directory'] = time.monotonic()
+
+
+def setResolvedUrl(handle, succeeded, listitem):  # pylint: disable=invalid-name
+    RESOLVED.append(listitem.path)
+    EVENTS['resolved'] = time.monotonic()
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcvfs
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import os
+
+
+def translatePath(path):  # pylint: disable=invalid-name
+    return path
+
+
+def mkdirs(path):
+    os.makedirs(path, exist_ok=True)
+    return True
+
+
+def exists(path):
+    return os.path.exists(path)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Module: artwork
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import hashlib
+import os
+import threading
+
+from urllib.parse import urlsplit
+
+import xbmc
+
+from resources.lib import kodiutils
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+# seconds a listing waits for the artwork downloads before it is shown
+ARTWORK_WAIT = 2
+
+
+class ArtworkCache(object):
+    """
+    Size-bounded local cache of the remote artwork. Images are downloaded concurrently, so that the listing can
+    point to the local copies when it is shown.
+    """
+
+    def __init__(self, path, user_agent, enabled=True, max_size=0, workers=4):
+        self.path = kodiutils.create_folder(path)
+        self.user_agent = user_agent
+        self.enabled = enabled
+        self.max_size = max_size
+        self.workers = workers
+
+        self._executor = None
+        self._session = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def get_file(self, url):
+        ext = os.path.splitext(urlsplit(url).path)[1].lower()
+        return os.path.join(self.path, hashlib.sha1(url.encode()).hexdigest() +
+                            (ext if ext in IMAGE_EXTENSIONS else ".jpg"))
+
+    def prefetch(self, urls):
+        """
+        Starts downloading the images, which are not cached yet. Returns immediately.
+        @param urls: iterable of the image urls
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for url in urls:
+                if not (url and url.startswith("http")) or url in self._futures:
+                    continue
+                if os.path.exists(self.get_file(url)):
+                    continue
+                if self._executor is None:
+                    # imported with the first download, most of the invocations have all the artwork cached
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers)
+                self._futures[url] = self._executor.submit(self.download, url)
+
+    def wait(self, timeout=ARTWORK_WAIT):
+        """
+        Waits for the started downloads, but not longer than timeout seconds
+        @return: True if all of them have completed
+        """
+        with self._lock:
+            futures = list(self._futures.values())
+        if not futures:
+            return True
+        from concurrent.futures import wait
+        done, not_done = wait(futures, timeout=timeout)
+        xbmc.log("Artwork downloaded: %s, pending: %s" % (len(done), len(not_done)), xbmc.LOGDEBUG)
+        return not not_done
+
+    def localize(self, art):
+        """
+        Replaces the remote artwork urls with the cached local copies
+        @param art: art dictionary of the list item
+        @return: new art dictionary
+        """
+        if not self.enabled:
+            return art
+        local_art = {}
+        for key, url in art.items():
+            local_art[key] = url
+            if url and url.startswith("http"):
+                spath = self.get_file(url)
+                try:
+                    # touch the file to keep it from eviction
+                    os.utime(spath)
+                    local_art[key] = spath
+                except OSError:
+                    pass
+        return local_art
+
+    def download(self, url):
+        spath = self.get_file(url)
+        try:
+            response = self.get_session().get(url, timeout=(3, 10))
+            if response.status_code != 200:
+                xbmc.log("Artwork %s returned HTTP error %s" % (url, response.status_code), xbmc.LOGDEBUG)
+                return
+            tmp_path = "%s.%s.tmp" % (spath, threading.get_ident())
+            with open(tmp_path, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp_path, spath)
+        except Exception as e:
+            xbmc.log("Artwork %s download failed: %s" % (url, e), xbmc.LOGDEBUG)
+
+    def get_session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+                self._session.headers.update({'User-Agent': self.user_agent})
+            return self._session
+
+    def evict(self):
+        if not self.max_size:
+            return
+        files = []
+        total = 0
+        for entry in os.scandir(self.path):
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_size:
+            return
+        files.sort()
+        for mtime, size, spath in files:
+            try:
+                os.remove(spath)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def close(self, wait=True):
+        """
+        Waits for the pending downloads and evicts the old artwork if the cache is full
+        @param wait: False to cancel the downloads not started yet and not to wait for the running ones
+        """
+        if self._executor is not None:
+            if not wait:
+                for future in self._futures.values():
+                    future.cancel()
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            self._futures = {}
+            if not wait:
+                # the running downloads still use the session
+                return
+            self.evict()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Module: cachestore
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+
+from collections import namedtuple
+
+import xbmc
+
+from resources.lib import statefile
+
+SCHEMA_VERSION = 2
+
+# payloads smaller than this are stored as is
+COMPRESS_MIN_SIZE = 512
+# the fastest level, higher ones barely shrink the JSON feeds further
+COMPRESS_LEVEL = 1
+
+ENCODING_NONE = ""
+ENCODING_ZLIB = "zlib"
+
+# page cache files <context>_<limit>_<offset>.json and the response cache folder the store has replaced
+LEGACY_PAGE_RE = re.compile(r"^[a-z]+_\d+_\d+\.json$")
+LEGACY_RESPONSES = "responses"
+
+CacheEntry = namedtuple("CacheEntry", ["payload", "created", "expires"])
+
+
+class CacheStore(object):
+    """
+    SQLite backed cache of the addon data. Entries are grouped by context, which can be invalidated at once by
+    bumping its generation. The least recently used entries are evicted when the store grows over max_size.
+    Payloads are stored compressed, the size of an entry is its size on disk.
+    """
+
+    def __init__(self, path, max_size=0):
+        self.path = path
+        self.max_size = max_size
+        self._db = None
+        self._lock = threading.RLock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            # imported on the first query, the offline actions listing no cached data don't need it
+            import sqlite3
+            self._db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self.create_schema()
+        return self._db
+
+    def create_schema(self):
+        if self.get_version() == SCHEMA_VERSION:
+            return
+        # the schema of the new store could be created by the concurrent plugin processes at once
+        with statefile.locked(self.path):
+            if self.get_version() != SCHEMA_VERSION:
+                self.recreate_schema()
+
+    def get_version(self):
+        return self._db.execute("PRAGMA user_version").fetchone()[0]
+
+    def recreate_schema(self):
+        xbmc.log("Creating cache store schema version %s" % SCHEMA_VERSION, xbmc.LOGDEBUG)
+        self._db.executescript("""
+            DROP TABLE IF EXISTS entries;
+            DROP TABLE IF EXISTS contexts;
+            CREATE TABLE contexts (context TEXT PRIMARY KEY,
+                                   generation INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE entries (key TEXT PRIMARY KEY,
+                                  context TEXT NOT NULL,
+                                  generation INTEGER NOT NULL,
+                                  payload BLOB,
+                                  encoding TEXT NOT NULL DEFAULT '',
+                                  size INTEGER NOT NULL,
+                                  created REAL NOT NULL,
+                                  expires REAL NOT NULL,
+                                  accessed REAL NOT NULL);
+            CREATE INDEX entries_context ON entries (context, generation);
+            CREATE INDEX entries_expires ON entries (expires);
+            CREATE INDEX entries_accessed ON entries (accessed);
+            PRAGMA user_version = %d;
+            """ % SCHEMA_VERSION)
+        self.remove_legacy_files()
+
+    def remove_legacy_files(self):
+        """
+        Removes the cache files of the addon versions before the store, once with the creation of its schema
+        """
+        path = os.path.dirname(self.path)
+        for name in os.listdir(path):
+            if LEGACY_PAGE_RE.match(name):
+                try:
+                    os.remove(os.path.join(path, name))
+                except OSError as e:
+                    xbmc.log("Legacy cache file %s is not removed: %s" % (name, e), xbmc.LOGWARNING)
+        shutil.rmtree(os.path.join(path, LEGACY_RESPONSES), ignore_errors=True)
+
+    def get(self, key):
+        """
+        Returns the entry for the key, including the expired one, or None if the key is not cached or its context
+        has been invalidated.
+        """
+        with self._lock:
+            row = self.db.execute("""
+                SELECT e.payload, e.encoding, e.created, e.expires FROM entries e
+                LEFT JOIN contexts c ON c.context = e.context
+                WHERE e.key = ? AND e.generation = IFNULL(c.generation, 0)""", (key,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            payload, encoding, created, expires = row
+            return CacheEntry(self.decode_payload(payload, encoding), created, expires)
+
+    def put(self, key, context, payload, expire=0):
+        """
+        Stores the payload
+        @param key: entry key
+        @param context: context the entry belongs to
+        @param payload: text to store
+        @param expire: seconds after which the entry expires, 0 means never
+        """
+        now = time.time()
+        data, encoding = self.encode_payload(payload)
+        with self._lock:
+            self.db.execute("""
+                INSERT OR REPLACE INTO entries (key, context, generation, payload, encoding, size, created, expires,
+                                                accessed)
+                VALUES (?, ?, IFNULL((SELECT generation FROM contexts WHERE context = ?), 0), ?, ?, ?, ?, ?, ?)""",
+                            (key, context, context, data, encoding, len(data), now, now + expire if expire else 0,
+                             now))
+            self.evict()
+
+    @staticmethod
+    def encode_payload(payload):
+        """
+        @param payload: text to store
+        @return: tuple of the bytes to store and their encoding
+        """
+        data = payload.encode("utf-8")
+        if len(data) < COMPRESS_MIN_SIZE:
+            return data, ENCODING_NONE
+        return zlib.compress(data, COMPRESS_LEVEL), ENCODING_ZLIB
+
+    @staticmethod
+    def decode_payload(data, encoding):
+        if encoding == ENCODING_ZLIB:
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+
+    @staticmethod
+    def is_expired(entry):
+        return entry.expires > 0 and entry.expires < time.time()
+
+    def invalidate(self, context):
+        """
+        Invalidates all entries of the context. Invalidated entries are deleted on the next eviction.
+        """
+        with self._lock:
+            self.db.execute("INSERT OR IGNORE INTO contexts (context, generation) VALUES (?, 0)", (context,))
+            self.db.execute("UPDATE contexts SET generation = generation + 1 WHERE context = ?", (context,))
+
+    def evict(self):
+        if not self.max_size or self.get_size() <= self.max_size:
+            return
+
+        self.db.execute("""
+            DELETE FROM entries WHERE generation <
+            IFNULL((SELECT generation FROM contexts c WHERE c.context = entries.context), 0)""")
+
+        excess = self.get_size() - self.max_size
+        if excess <= 0:
+            return
+        keys = []
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        xbmc.log("Evicting %s entries from the cache store" % len(keys), xbmc.LOGDEBUG)
+        self.db.executemany("DELETE FROM entries WHERE key = ?", keys)
+
+    def get_size(self):
+        return self.db.execute("SELECT IFNULL(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
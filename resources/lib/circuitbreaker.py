@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Module: circuitbreaker
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import json
+import time
+
+import xbmc
+
+CONTEXT = "circuits"
+
+# consecutive failures opening the circuit of the host
+FAILURE_THRESHOLD = 3
+# seconds the open circuit fails the requests without querying the host
+COOL_DOWN = 120
+
+
+class CircuitBreaker(object):
+    """
+    Per host circuit breaker shared by the plugin processes through the cache store. After FAILURE_THRESHOLD
+    consecutive failures the circuit opens and the requests to the host fail fast for COOL_DOWN seconds.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    @staticmethod
+    def get_key(host):
+        return "circuit:%s" % host
+
+    def get_state(self, host):
+        entry = self.store.get(self.get_key(host))
+        return json.loads(entry.payload) if entry else {'failures': 0, 'open_until': 0}
+
+    def is_open(self, host):
+        return self.get_state(host)['open_until'] > time.time()
+
+    def record_success(self, host):
+        if self.get_state(host)['failures']:
+            self.store.put(self.get_key(host), CONTEXT, json.dumps({'failures': 0, 'open_until': 0}))
+
+    def record_failure(self, host):
+        """
+        @return: True if the failure has opened the circuit
+        """
+        state = self.get_state(host)
+        state['failures'] += 1
+        is_opened = state['failures'] >= FAILURE_THRESHOLD and state['open_until'] <= time.time()
+        if is_opened:
+            xbmc.log("Circuit of %s is open for %s s" % (host, COOL_DOWN), xbmc.LOGWARNING)
+            state['open_until'] = time.time() + COOL_DOWN
+            # a single failure after the cool-down opens the circuit again
+            state['failures'] = FAILURE_THRESHOLD - 1
+        self.store.put(self.get_key(host), CONTEXT, json.dumps(state))
+        return is_opened
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Module: hls
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import re
+
+from collections import namedtuple
+from urllib.parse import urljoin
+
+import xbmc
+
+# seconds to keep the fetched master playlists in the response cache
+MANIFEST_TTL = 60
+
+# max video height for the values of the quality setting
+QUALITY_HEIGHTS = (0, 1080, 720, 540, 360, 243)
+
+Variant = namedtuple("Variant", ["uri", "bandwidth", "width", "height"])
+
+ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_attributes(line):
+    return {key: value.strip('"') for key, value in ATTRIBUTE_RE.findall(line.split(":", 1)[1])}
+
+
+def parse_master_playlist(text, base_url):
+    """
+    Parses the variant streams of the HLS master playlist
+    @param text: playlist content
+    @param base_url: url of the playlist to resolve the relative variant uris
+    @return: list of Variant, empty if the playlist is not a master playlist
+    """
+    variants = []
+    attributes = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            attributes = parse_attributes(line)
+        elif line and not line.startswith("#") and attributes is not None:
+            width, height = 0, 0
+            if 'x' in attributes.get('RESOLUTION', ""):
+                width, height = (int(v) for v in attributes['RESOLUTION'].split("x", 1))
+            variants.append(Variant(uri=urljoin(base_url, line),
+                                    bandwidth=int(attributes.get('BANDWIDTH', 0)),
+                                    width=width,
+                                    height=height))
+            attributes = None
+    return variants
+
+
+def select_variant(variants, max_height=0, max_bandwidth=0):
+    """
+    Selects the best variant not exceeding the limits or the smallest one if none of them fits
+    """
+    if not variants:
+        return None
+    fitting = [v for v in variants
+               if (not max_height or v.height <= max_height) and (not max_bandwidth or v.bandwidth <= max_bandwidth)]
+    if fitting:
+        return max(fitting, key=lambda v: (v.height, v.bandwidth))
+    return min(variants, key=lambda v: (v.height, v.bandwidth))
+
+
+class HlsResolver(object):
+
+    def __init__(self, site):
+        self.site = site
+
+    def resolve(self, url, max_height=0, max_bandwidth=0):
+        """
+        Resolves the master playlist url to the url of the variant stream matching the limits
+        @param url: url of the master playlist
+        @param max_height: max video height, 0 for no limit
+        @param max_bandwidth: max bandwidth in bits per second, 0 for no limit
+        @return: url of the variant or the original url if no limits are set or the playlist can't be resolved
+        """
+        if not (max_height or max_bandwidth):
+            return url
+
+        text = self.site.request(url, output="text", ttl=MANIFEST_TTL)
+        variant = select_variant(parse_master_playlist(text, url), max_height, max_bandwidth)
+        if variant is None:
+            xbmc.log("No variants found in %s" % url, xbmc.LOGDEBUG)
+            return url
+
+        xbmc.log("Selected variant %sx%s %s bps: %s" % (variant.width, variant.height, variant.bandwidth,
+                                                        variant.uri), xbmc.LOGDEBUG)
+        return variant.uri
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Module: httpcache
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import json
+import time
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+CONTEXT = "responses"
+FAILURES_CONTEXT = "failures"
+
+# seconds to remember the failed url and not to query it again
+FAILURE_TTL = 30
+
+
+class ResponseCache(object):
+    """
+    Cache of the site responses keyed by the normalized url. Expired entries are kept for the conditional
+    revalidation with ETag and Last-Modified validators. Failed urls are remembered for FAILURE_TTL seconds.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    @staticmethod
+    def normalize_url(url):
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+    def get(self, url):
+        entry = self.store.get(self.normalize_url(url))
+        if entry is None:
+            return None
+        data = json.loads(entry.payload)
+        data['time'] = entry.created
+        return data
+
+    def put(self, url, response):
+        entry = {'etag': response.headers.get('ETag', ""),
+                 'last_modified': response.headers.get('Last-Modified', ""),
+                 'content': response.text}
+        self.touch(url, entry)
+        return entry
+
+    def touch(self, url, entry):
+        entry['time'] = time.time()
+        self.store.put(self.normalize_url(url), CONTEXT, json.dumps(entry))
+
+    def mark_failed(self, url):
+        self.store.put("failed:%s" % self.normalize_url(url), FAILURES_CONTEXT, "", expire=FAILURE_TTL)
+
+    def is_failed(self, url):
+        entry = self.store.get("failed:%s" % self.normalize_url(url))
+        return entry is not None and not self.store.is_expired(entry)
+
+    @staticmethod
+    def is_fresh(entry, ttl):
+        return time.time() - entry.get('time', 0) < ttl
+
+    @staticmethod
+    def get_validators(entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Module: httpservice
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Background service keeping a warm HTTP session for the plugin invocations. The plugin sends its requests to the
+service over a local TCP socket and falls back to the in-process session if the service is not reachable.
+"""
+import json
+import socketserver
+import threading
+
+import xbmc
+import xbmcgui
+
+from resources.lib.serviceclient import HOME_WINDOW, LOCALHOST, PORT_PROPERTY
+from resources.lib.warmup import WarmUp
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            query = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+
+        url = query.get('url', "")
+        try:
+            response = self.server.user.get_http(url, headers=query.get('headers'))
+            content = response.content
+            meta = {'status_code': response.status_code,
+                    'encoding': response.encoding,
+                    'headers': dict(response.headers)}
+        except Exception as e:
+            xbmc.log("Service failed to query %s: %s" % (url, e), xbmc.LOGERROR)
+            content = b""
+            meta = {'status_code': 0}
+
+        meta['length'] = len(content)
+        self.wfile.write(json.dumps(meta).encode() + b"\n")
+        self.wfile.write(content)
+
+
+class HttpService(xbmc.Monitor):
+
+    def __init__(self, site, user):
+        super(HttpService, self).__init__()
+        self.site = site
+        self.user = user
+        self.server = None
+        self.thread = None
+        self.warmup = WarmUp(site, self)
+
+    def run(self):
+        self.start()
+        while not self.abortRequested():
+            if self.waitForAbort(10):
+                break
+            if self.server:
+                self.warmup.tick()
+        self.stop()
+
+    def start(self):
+        if self.site.addon.getSetting("use_service") == "false":
+            xbmc.log("Background service is disabled in settings", xbmc.LOGINFO)
+            return
+
+        self.user.start_session(self.site)
+        self.site.user = self.user
+
+        self.server = socketserver.ThreadingTCPServer((LOCALHOST, 0), RequestHandler)
+        self.server.daemon_threads = True
+        self.server.user = self.user
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        port = self.server.server_address[1]
+        xbmcgui.Window(HOME_WINDOW).setProperty(PORT_PROPERTY, str(port))
+        xbmc.log("Background service is listening on port %s" % port, xbmc.LOGINFO)
+
+    def stop(self):
+        xbmcgui.Window(HOME_WINDOW).clearProperty(PORT_PROPERTY)
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+        self.user.close_session()
+
+    def onSettingsChanged(self):  # pylint: disable=invalid-name
+        self.stop()
+        self.start()
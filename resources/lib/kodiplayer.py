@@ -3,6 +3,8 @@
 # Created on: 03.04.2021
 # License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
 
+import time
+
 import xbmc
 
 
@@ -19,6 +21,12 @@ class KodiPlayer(xbmc.Player):
         self.__playPlayBackStoppedEventsTriggered = False  # pylint: disable=invalid-name
         self.__pollInterval = 1  # pylint: disable=invalid-name
 
+        self.started_at = None
+        self.has_error = False
+        self.has_ended = False
+        # number of the onAVStarted events, another one means the next file is played
+        self.av_started = 0
+
     def waitForPlayBack(self, url=None, time_out=30):  # pylint: disable=invalid-name
 
         xbmc.log("Player: Waiting for playback", xbmc.LOGDEBUG)
@@ -49,6 +57,8 @@ class KodiPlayer(xbmc.Player):
     def onAVStarted(self):  # pylint: disable=invalid-name
         """ Will be called when Kodi has a video or audiostream """
         xbmc.log("Player: [onAVStarted] called", xbmc.LOGDEBUG)
+        self.started_at = time.monotonic()
+        self.av_started += 1
         self.__playback_started()
 
     def onPlayBackStopped(self):  # pylint: disable=invalid-name
@@ -56,11 +66,36 @@ class KodiPlayer(xbmc.Player):
         xbmc.log("Player: [onPlayBackStopped] called", xbmc.LOGDEBUG)
         self.__playback_stopped()
 
+    def onPlayBackEnded(self):  # pylint: disable=invalid-name
+        """ Will be called when Kodi has ended playing a file """
+        xbmc.log("Player: [onPlayBackEnded] called", xbmc.LOGDEBUG)
+        self.has_ended = True
+        self.__playback_stopped()
+
     def onPlayBackError(self):  # pylint: disable=invalid-name
         """ Will be called when playback stops due to an error. """
         xbmc.log("Player: [onPlayBackError] called", xbmc.LOGDEBUG)
+        self.has_error = True
         self.__playback_stopped()
 
+    def get_playing_file(self):
+        """ Returns the playing file or an empty string if nothing is playing """
+        try:
+            return self.getPlayingFile()
+        except RuntimeError:
+            return ""
+
+    def is_playback_over(self, av_started, playing_file):
+        """ Checks whether the followed playback is over
+        :param int av_started: av_started counter of the followed playback
+        :param str playing_file: file of the followed playback
+        :return: True if it has ended or stopped, or another file is playing
+        :rtype: bool
+        """
+        if self.__playPlayBackStoppedEventsTriggered or self.av_started != av_started or not self.isPlaying():
+            return True
+        return self.get_playing_file() != playing_file
+
     def __playback_stopped(self):
         """ Sets the correct flags after playback stopped """
         self.__playBackEventsTriggered = False
@@ -5,7 +5,6 @@
 # License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
 
 import os
-import glob
 import re
 
 import json
@@ -21,7 +20,7 @@ import xbmcvfs
 
 def show_error_message(msg):
     xbmc.log(msg, xbmc.LOGDEBUG)
-    xbmc.executebuiltin("XBMC.Notification(%s,%s, %s)" % ("ERROR", msg, str(3 * 1000)))
+    xbmc.executebuiltin("Notification(%s,%s, %s)" % ("ERROR", msg, str(3 * 1000)))
 
 
 def kodi_version():
@@ -34,6 +33,33 @@ def kodi_version_major():
     return int(kodi_version().split('.')[0])
 
 
+# ListItem info labels and the matching InfoTagVideo setters
+INFO_TAG_SETTERS = {
+    'title': "setTitle",
+    'originaltitle': "setOriginalTitle",
+    'plot': "setPlot",
+    'plotoutline': "setPlotOutline",
+    'tagline': "setTagLine",
+    'mediatype': "setMediaType",
+    'year': "setYear",
+    'duration': "setDuration",
+    'premiered': "setPremiered",
+}
+
+
+def set_info(list_item, info, info_type="video", use_info_tag=True):
+    """
+    Sets the info labels of the list item through InfoTagVideo, falls back to the deprecated setInfo
+    for the older Kodi versions, non-video items and the labels without a setter.
+    """
+    if use_info_tag and info_type == "video" and all(key in INFO_TAG_SETTERS for key in info):
+        info_tag = list_item.getVideoInfoTag()
+        for key, value in info.items():
+            getattr(info_tag, INFO_TAG_SETTERS[key])(value)
+    else:
+        list_item.setInfo(info_type, info)
+
+
 def create_folder(folder):
     if not (os.path.exists(folder) and os.path.isdir(folder)):
         xbmcvfs.mkdirs(folder)
@@ -55,11 +81,6 @@ def get_sec_since_last_mod(spath):
     return time.time() - get_file_timestamp(spath)
 
 
-def remove_files_by_pattern(pattern):
-    for f in glob.glob(pattern):
-        os.remove(f)
-
-
 def clean_html(raw_html):
     try:
         cleanr = re.compile('<.*?>|&([a-z0-9]+|#[0-9]{1,6}|#x[0-9a-f]{1,6});')
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+# Module: localindex
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import json
+import re
+import threading
+import time
+
+import xbmc
+
+from resources.lib import statefile
+from resources.lib.kodiutils import clean_html
+
+SCHEMA_VERSION = 2
+
+# element fields kept in the index to recreate the list item
+DOC_FIELDS = ('id', 'title', 'domain', 'video', 'image', 'image_squared', 'big_card_image')
+
+# endings of the Snowball stemmer of the Russian words, the ones of the *_A sets are removed only after а or я
+RU_VOWELS = "аеиоуыэюя"
+RU_PERFECTIVE_GERUND_A = {"в", "вши", "вшись"}
+RU_PERFECTIVE_GERUND = {"ив", "ивши", "ившись", "ыв", "ывши", "ывшись"}
+RU_ADJECTIVE = {"ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом", "его", "ого",
+                "ему", "ому", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею"}
+RU_PARTICIPLE_A = {"ем", "нн", "вш", "ющ", "щ"}
+RU_PARTICIPLE = {"ивш", "ывш", "ующ"}
+RU_REFLEXIVE = {"ся", "сь"}
+RU_VERB_A = {"ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет", "ют", "ны", "ть", "ешь", "нно"}
+RU_VERB = {"ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй", "ил", "ыл", "им", "ым", "ен", "ило",
+           "ыло", "ено", "ят", "ует", "уют", "ит", "ыт", "ены", "ить", "ыть", "ишь", "ую", "ю"}
+RU_NOUN = {"а", "ев", "ов", "ие", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и", "ией", "ей", "ой", "ий", "й",
+           "иям", "ям", "ием", "ем", "ам", "ом", "о", "у", "ах", "иях", "ях", "ы", "ь", "ию", "ью", "ю", "ия", "ья",
+           "я"}
+RU_DERIVATIONAL = {"ост", "ость"}
+RU_SUPERLATIVE = {"ейш", "ейше"}
+RU_MAX_ENDING = 6
+EN_SUFFIXES = ("ings", "ing", "ies", "ed", "es", "s")
+
+MIN_STEM = 3
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+CYRILLIC_RE = re.compile("[а-я]")
+
+
+def stem(token):
+    if CYRILLIC_RE.search(token):
+        return stem_ru(token)
+    for suffix in EN_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            return token[:-len(suffix)]
+    return token
+
+
+def stem_ru(word):
+    """
+    Snowball stemmer of the Russian words, see https://snowballstem.org/algorithms/russian/stemmer.html
+    @param word: lower case word with ё replaced by е
+    @return: stem of the word
+    """
+    rv = len(word)
+    for i, char in enumerate(word):
+        if char in RU_VOWELS:
+            rv = i + 1
+            break
+    r2 = get_region(word, get_region(word, 0))
+
+    # step 1
+    stemmed = strip_ending(word, rv, RU_PERFECTIVE_GERUND, RU_PERFECTIVE_GERUND_A)
+    if stemmed is None:
+        word = strip_ending(word, rv, RU_REFLEXIVE) or word
+        stemmed = strip_ending(word, rv, RU_ADJECTIVE)
+        if stemmed is not None:
+            stemmed = strip_ending(stemmed, rv, RU_PARTICIPLE, RU_PARTICIPLE_A) or stemmed
+        else:
+            stemmed = strip_ending(word, rv, RU_VERB, RU_VERB_A) or strip_ending(word, rv, RU_NOUN)
+    word = stemmed or word
+
+    # step 2
+    if word.endswith("и") and len(word) > rv:
+        word = word[:-1]
+
+    # step 3
+    derivational = strip_ending(word, rv, RU_DERIVATIONAL)
+    if derivational is not None and len(derivational) >= r2:
+        word = derivational
+
+    # step 4
+    if word.endswith("нн") and len(word) - 1 > rv:
+        return word[:-1]
+    superlative = strip_ending(word, rv, RU_SUPERLATIVE)
+    if superlative is not None:
+        return superlative[:-1] if superlative.endswith("нн") and len(superlative) - 1 > rv else superlative
+    if word.endswith("ь") and len(word) > rv:
+        return word[:-1]
+    return word
+
+
+def get_region(word, start):
+    """
+    @return: position after the first non-vowel following a vowel after start, R1 of the word for start 0
+    """
+    for i in range(start + 1, len(word)):
+        if word[i] not in RU_VOWELS and word[i - 1] in RU_VOWELS:
+            return i + 1
+    return len(word)
+
+
+def strip_ending(word, start, endings, endings_a=()):
+    """
+    Removes the longest of the endings found after start
+    @param endings: set of the endings
+    @param endings_a: set of the endings removed only after а or я. If the longest ending found is one of them and
+    it does not follow а or я, the word is left as is.
+    @return: the word without the ending or None if it has none of them
+    """
+    for cut in range(max(start, len(word) - RU_MAX_ENDING), len(word)):
+        ending = word[cut:]
+        if ending in endings_a:
+            return word[:cut] if cut > start and word[cut - 1] in "ая" else None
+        if ending in endings:
+            return word[:cut]
+    return None
+
+
+def tokenize(text):
+    """
+    Splits the text into the stemmed terms, Cyrillic and Latin aware
+    @param text: text to split
+    @return: set of the terms
+    """
+    text = text.casefold().replace("ё", "е")
+    return set(stem(token) for token in TOKEN_RE.findall(text) if len(token) > 1 or token.isdigit())
+
+
+class LocalIndex(object):
+    """
+    Incremental inverted index over the video items seen in the feeds. Items not seen for max_age seconds are
+    removed from the index.
+    """
+
+    def __init__(self, path, max_age=0):
+        self.path = path
+        self.max_age = max_age
+        self._db = None
+        self._lock = threading.RLock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            import sqlite3
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self.create_schema()
+        return self._db
+
+    def create_schema(self):
+        if self.get_version() == SCHEMA_VERSION:
+            return
+        # the concurrent plugin processes could be creating the schema of the new index at once
+        with statefile.locked(self.path):
+            if self.get_version() != SCHEMA_VERSION:
+                self.recreate_schema()
+
+    def get_version(self):
+        return self._db.execute("PRAGMA user_version").fetchone()[0]
+
+    def recreate_schema(self):
+        xbmc.log("Creating local index schema version %s" % SCHEMA_VERSION, xbmc.LOGDEBUG)
+        self._db.executescript("""
+            DROP TABLE IF EXISTS postings;
+            DROP TABLE IF EXISTS docs;
+            CREATE TABLE docs (id TEXT PRIMARY KEY,
+                               payload TEXT NOT NULL,
+                               seen REAL NOT NULL);
+            CREATE INDEX docs_seen ON docs (seen);
+            CREATE TABLE postings (term TEXT NOT NULL,
+                                   doc_id TEXT NOT NULL,
+                                   PRIMARY KEY (term, doc_id)) WITHOUT ROWID;
+            CREATE INDEX postings_doc ON postings (doc_id);
+            PRAGMA user_version = %d;
+            """ % SCHEMA_VERSION)
+
+    def add(self, elements):
+        """
+        Adds the feed elements to the index or refreshes the time they have been seen
+        @param elements: list of the elements returned by the site
+        """
+        now = time.time()
+        with self._lock, self.db:
+            for element in elements:
+                doc_id = str(element.get('id', ""))
+                if not doc_id:
+                    continue
+                if self.db.execute("UPDATE docs SET seen = ? WHERE id = ?", (now, doc_id)).rowcount:
+                    continue
+                doc = {key: element[key] for key in DOC_FIELDS if key in element}
+                self.db.execute("INSERT INTO docs (id, payload, seen) VALUES (?, ?, ?)",
+                                (doc_id, json.dumps(doc), now))
+                terms = tokenize("%s %s" % (clean_html(element.get('title', "")), element.get('domain', "")))
+                self.db.executemany("INSERT OR IGNORE INTO postings (term, doc_id) VALUES (?, ?)",
+                                    [(term, doc_id) for term in terms])
+            self.prune(now)
+
+    def prune(self, now):
+        if not self.max_age:
+            return
+        cutoff = now - self.max_age
+        self.db.execute("DELETE FROM postings WHERE doc_id IN (SELECT id FROM docs WHERE seen < ?)", (cutoff,))
+        self.db.execute("DELETE FROM docs WHERE seen < ?", (cutoff,))
+
+    def search(self, query, limit=100):
+        """
+        Finds the elements containing all terms of the query, the most recently seen first
+        @param query: text to search
+        @param limit: maximum number of the elements to return
+        @return: list of the elements
+        """
+        terms = list(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            rows = self.db.execute("""
+                SELECT d.payload FROM docs d
+                JOIN (SELECT doc_id FROM postings WHERE term IN (%s)
+                      GROUP BY doc_id HAVING COUNT(*) = ?) p ON p.doc_id = d.id
+                ORDER BY d.seen DESC LIMIT ?""" % ",".join("?" * len(terms)),
+                                   terms + [len(terms), limit]).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Module: modules
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+from importlib import import_module
+
+# Context name -> (module, page class). Modules are imported only when the context is requested.
+CONTEXTS = {
+    'home': ("resources.lib.modules.home", "Home"),
+    'searches': ("resources.lib.modules.searches", "Search"),
+    'videos': ("resources.lib.modules.videos", "Video"),
+    'news': ("resources.lib.modules.news", "News"),
+}
+
+# Actions, which do not query the site and can be served without opening the HTTP session
+OFFLINE_ACTIONS = {
+    'home': ("load", "favorites", "playback_stats", "trace_report"),
+    'searches': ("load", "clear_history", "search_local"),
+}
+
+
+def get_page_class(context):
+    module_name, class_name = CONTEXTS[context]
+    return getattr(import_module(module_name), class_name)
+
+
+def is_offline_action(context, action):
+    return action in OFFLINE_ACTIONS.get(context, ())
@@ -4,11 +4,15 @@
 # Created on: 03.04.2021
 # License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
 import xbmc
+import xbmcgui
 
+import resources.lib.modules.news as news
 import resources.lib.modules.pages as pages
 import resources.lib.modules.searches as searches
 import resources.lib.modules.videos as videos
+from resources.lib import tracing
 from resources.lib.kodiutils import get_url
+from resources.lib.telemetry import percentile
 
 
 class Home(pages.Page):
@@ -19,8 +23,25 @@ class Home(pages.Page):
 
         home_menu = [search.create_root_li(),
                      video.create_root_li(),
+                     news.News(self.site).create_root_li(),
                      self.create_fav_li()]
 
+        if self.site.addon.getSetting("playback_telemetry") == "true":
+            home_menu.append(self.create_menu_li("playback_stats", 30700, is_folder=False, is_playable=False,
+                                                 url=get_url(self.site.url, action="playback_stats",
+                                                             context="home", url=self.site.url),
+                                                 info={'plot': self.site.language(30701)},
+                                                 art={'icon': self.site.get_media("videos.png"),
+                                                      'fanart': self.site.get_media("background.jpg")}))
+
+        if tracing.is_enabled():
+            home_menu.append(self.create_menu_li("trace_report", 30710, is_folder=False, is_playable=False,
+                                                 url=get_url(self.site.url, action="trace_report",
+                                                             context="home", url=self.site.url),
+                                                 info={'plot': self.site.language(30711)},
+                                                 art={'icon': self.site.get_media("videos.png"),
+                                                      'fanart': self.site.get_media("background.jpg")}))
+
         return {'data': home_menu}
 
     def set_context_title(self):
@@ -33,3 +54,28 @@ class Home(pages.Page):
 
     def favorites(self):
         xbmc.executebuiltin("ActivateWindow(Favourites)")
+
+    def playback_stats(self):
+        summary = self.get_playback_metrics().get_summary()
+        lines = [self.site.language(30702) % (summary['count'], summary['errors'], summary['stalls']),
+                 self.site.language(30703) % (summary['resolve_p50'], summary['resolve_p95']),
+                 self.site.language(30704) % (summary['start_p50'], summary['start_p95']),
+                 ""]
+        for host, stats in sorted(summary['hosts'].items()):
+            lines.append("[B]%s[/B]: %s" % (host, self.site.language(30705) % (stats['count'], stats['errors'],
+                                                                              stats['start_p50'])))
+        xbmcgui.Dialog().textviewer(self.site.language(30700), "\n".join(lines))
+
+    def trace_report(self):
+        lines = []
+        for name, entry in sorted(tracing.get_report(self.site.trace_file).items()):
+            lines.append("[B]%s[/B]: %s" % (name, self.site.language(30712) % (entry['count'],
+                                                                              percentile(entry['ms'], 50),
+                                                                              percentile(entry['ms'], 95))))
+            if any(entry['max_rss_kb']):
+                lines.append("    %s" % (self.site.language(30713) % (max(entry['max_rss_kb']) // 1024)))
+            for span_name, durations in sorted(entry['spans'].items(), key=lambda s: -percentile(s[1], 50)):
+                lines.append("    %s: p50 %s ms, p95 %s ms" % (span_name,
+                                                              percentile(durations, 50),
+                                                              percentile(durations, 95)))
+        xbmcgui.Dialog().textviewer(self.site.language(30710), "\n".join(lines))
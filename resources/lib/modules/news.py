@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Module: news
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import xbmc
+
+import resources.lib.modules.searches as searches
+import resources.lib.modules.videos as videos
+from resources.lib.kodiutils import get_url
+
+
+class News(videos.Video):
+    """
+    Combined listing of the video feed and the most used saved searches, fetched concurrently and deduplicated
+    """
+
+    def create_root_li(self):
+        return self.create_menu_li("videos", 30301, is_folder=True, is_playable=False,
+                                   url=self.get_nav_url(),
+                                   info={'plot': self.site.language(30303)})
+
+    def set_context_title(self):
+        self.site.context_title = self.site.language(30301)
+
+    def get_nav_url(self, load_url="", offset=0):
+        return get_url(self.site.url,
+                       action="load",
+                       context="news",
+                       content="videos",
+                       url=self.site.url)
+
+    def get_feed_urls(self):
+        urls = [get_url(self.site.api_url + '/launcher/video-more', country_code="ru")]
+        limit = int(self.site.addon.getSetting("news_searches") or 0)
+        if limit:
+            for element in searches.Search(self.site).history.most_used(limit):
+                urls.append(get_url(self.site.api_url + '/launcher/zen-search', country_code="ru",
+                                    types="video",
+                                    query=element['title']))
+        return urls
+
+    def get_data_query(self):
+        urls = self.get_feed_urls()
+        timeout = int(self.site.addon.getSetting("news_timeout") or 0) or None
+        xbmc.log("Loading %s news feeds" % len(urls), xbmc.LOGDEBUG)
+        feeds = [data.get('items', []) if data else []
+                 for data in self.site.request_many(urls, output="json", ttl=self.get_response_ttl(),
+                                                    stale=True, timeout=timeout)]
+
+        items = self.merge_feeds(feeds)
+        self.prefetch_artwork(items)
+        return {'data': items}
+
+    @staticmethod
+    def merge_feeds(feeds):
+        """
+        Interleaves the feeds, so that every feed is represented at the top, and drops the repeated items
+        @param feeds: lists of the elements
+        @return: merged list of the elements
+        """
+        items = []
+        seen = set()
+        for i in range(max(len(feed) for feed in feeds) if feeds else 0):
+            for feed in feeds:
+                if i < len(feed):
+                    item_id = feed[i].get('id', "")
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    items.append(feed[i])
+        return items
@@ -13,7 +13,19 @@ import xbmcgui
 import xbmcplugin
 
 from urllib.parse import quote as encode4url
-from ..kodiutils import remove_files_by_pattern, upnext_signal, kodi_version_major, get_url
+from ..kodiutils import upnext_signal, kodi_version_major, get_url, set_info
+from ..artwork import ARTWORK_WAIT
+from ..hls import HlsResolver, QUALITY_HEIGHTS
+from ..kodiplayer import KodiPlayer
+from ..telemetry import PlaybackMetrics, PlaybackTracker
+from .. import statefile
+from .. import tracing
+
+# seconds to wait for the resolved url to start playing
+START_TIMEOUT = 30
+
+# maximum number of the items listed in a skin widget
+WIDGET_ITEMS = 20
 
 
 class Page(object):
@@ -33,26 +45,31 @@ class Page(object):
         self.prev_page = ""
 
         self.cache_enabled = False
-        self.cache_file = ""
+        self.cache_key = ""
+        self.cache_entry = None
+        self.cache_stale = False
         self.cache_expire = int(self.params.get('cache_expire', 0))
 
-    def load(self):
+        # skin widgets are listed from cache without the navigation and context menus
+        self.widget = self.site.is_widget()
 
-        self.preload()
+    def load(self):
 
-        self.cache_file = self.get_cache_filename()
+        if not self.widget:
+            self.preload()
 
-        xbmc.log("Cache file name: %s" % self.cache_file)
+        self.cache_key = self.get_cache_key()
 
-        self.data = self.get_data_query()
+        xbmc.log("Cache key: %s" % self.cache_key)
 
-        xbmc.log("Items per page: %s" % len(self.data['data']), xbmc.LOGDEBUG)
+        with tracing.span("get_data_query"):
+            self.data = self.get_data_query()
 
         self.set_context_title()
 
         self.set_navigation_pages()
 
-        if self.prev_page and self.offset > 0:
+        if self.prev_page and self.offset > 0 and not self.widget:
             self.list_items.append(self.create_menu_li("previous",
                                                        label=30032, is_folder=True, is_playable=False,
                                                        url=self.get_nav_url(load_url=self.prev_page,
@@ -60,18 +77,29 @@ class Page(object):
                                                        info={'plot': self.site.language(30031) %
                                                                      (self.offset + 1)}))
 
-        if self.data.get('pagination', ""):
+        if self.data.get('pagination', "") and not self.widget:
             self.list_items.append(self.create_menu_li("home", label=30020, is_folder=True, is_playable=False,
                                                        url=self.site.url,
                                                        info={'plot': self.site.language(30021)}))
 
         if 'data' in self.data:
+            # data can be an iterator over several pages, which updates the pagination as it goes
+            elements = []
             for element in self.data['data']:
+                if self.widget and len(elements) >= WIDGET_ITEMS:
+                    break
+                elements.append(element)
                 self.append_li_for_element(element)
+            self.data['data'] = elements
+
+            xbmc.log("Items per page: %s" % len(elements), xbmc.LOGDEBUG)
 
-            self.cache_data()
+            self.set_navigation_pages()
 
-        if self.next_page:
+            if not self.widget:
+                self.cache_data()
+
+        if self.next_page and not self.widget:
             self.list_items.append(self.create_menu_li("first", label=30030, is_folder=True, is_playable=False,
                                                        url=self.get_nav_url(load_url=self.next_page,
                                                                             offset=self.offset + 1),
@@ -80,7 +108,14 @@ class Page(object):
 
         self.postload()
 
-        self.show_list_items()
+        with tracing.span("show_list_items"):
+            self.show_list_items()
+
+        # the time limit applies to the listing only, the background work after it has its own timeouts
+        self.site.deadline = None
+
+        with tracing.span("afterload"):
+            self.afterload()
 
     def preload(self):
         """
@@ -96,6 +131,74 @@ class Page(object):
         """
         pass
 
+    def afterload(self):
+        """
+        Override this function if it is necessary to perform some actions after the list items have been shown.
+        By default, the data served stale from cache is revalidated and the next pages are prefetched into the
+        response cache.
+        @return:
+        """
+        self.revalidate()
+        if not self.widget:
+            self.prefetch()
+
+    def revalidate(self):
+        changed = False
+        with tracing.span("revalidate"):
+            if self.cache_stale:
+                changed = self.refresh_cache()
+            if self.site.stale_urls:
+                changed = self.site.revalidate() or changed
+        if changed and self.is_context_shown():
+            xbmc.log("Stale data has changed, refreshing the listing", xbmc.LOGDEBUG)
+            xbmc.executebuiltin("Container.Refresh")
+
+    def refresh_cache(self):
+        """
+        Queries the data again instead of the expired cache entry, which has been shown, and caches it
+        @return: True if the data has changed
+        """
+        cached = self.data
+        self.cache_stale = False
+        self.cache_entry = None
+        self.cache_enabled = False
+        try:
+            self.data = self.get_data_query()
+        finally:
+            self.cache_enabled = True
+        if not self.data.get('data'):
+            return False
+        self.cache_data()
+        return json.dumps(self.data) != json.dumps(cached)
+
+    def prefetch(self):
+        depth = int(self.site.addon.getSetting("prefetch_depth") or 0)
+        if not (depth and self.next_page and self.get_response_ttl()):
+            return
+
+        monitor = xbmc.Monitor()
+        # let Kodi show the listing before checking if the user is still there
+        if monitor.waitForAbort(0.5):
+            return
+
+        url = self.next_page
+        while depth > 0 and url and self.is_context_shown() and not monitor.abortRequested():
+            xbmc.log("Prefetching %s" % url, xbmc.LOGDEBUG)
+            url = self.prefetch_page(url)
+            depth -= 1
+
+    def prefetch_page(self, url):
+        """
+        Override this function to prefetch the page into the response cache.
+        @param url: url of the page to prefetch
+        @return: url of the page following the prefetched one
+        """
+        return ""
+
+    def is_context_shown(self):
+        path = xbmc.getInfoLabel("Container.FolderPath")
+        return path.startswith(self.site.url) and ("context=%s" % self.context) in path
+
     def play(self):
         pass
 
@@ -103,6 +206,12 @@ class Page(object):
 
         xbmc.log("Play url: %s" % url, xbmc.LOGDEBUG)
 
+        started = time.monotonic()
+        video_id = url
+
+        if '.m3u8' in url:
+            url = self.resolve_hls_url(url)
+
         play_item = xbmcgui.ListItem(path=self.site.prepare_url(url))
 
         play_item.setMimeType('application/x-mpegURL')
@@ -115,6 +224,89 @@ class Page(object):
 
         xbmcplugin.setResolvedUrl(self.site.handle, True, listitem=play_item)
 
+        # the time limit applies to the resolution only, the feed playback queries the site while the video plays
+        self.site.deadline = None
+
+        self.watch_playback(video_id, url, started, time.monotonic())
+
+    def watch_playback(self, video_id, url, started, resolved):
+        """
+        Follows the playback started by the plugin while the telemetry or the feed playback need it.
+        @param video_id: id of the played video
+        @param url: resolved stream url
+        @param started: monotonic time the play action has started
+        @param resolved: monotonic time the url has been resolved
+        """
+        tracker = None
+        if self.site.addon.getSetting("playback_telemetry") == "true":
+            tracker = PlaybackTracker(self.get_playback_metrics(), video_id, url, started, resolved)
+        if tracker is None and not self.is_feed_playback():
+            return
+
+        player = KodiPlayer()
+        monitor = xbmc.Monitor()
+
+        is_playing = player.waitForPlayBack(time_out=START_TIMEOUT)
+        if tracker is not None:
+            tracker.start(player, is_playing)
+        if is_playing:
+            self.on_playback_started(player)
+
+        # the playback is followed until the file changes, as the next video is played by another invocation
+        av_started = player.av_started
+        playing_file = player.get_playing_file()
+        while is_playing and not player.is_playback_over(av_started, playing_file) and not monitor.abortRequested():
+            if tracker is not None:
+                tracker.update()
+            self.on_playback_progress(player)
+            monitor.waitForAbort(1)
+
+        self.on_playback_stopped(player)
+        if tracker is not None:
+            tracker.stop(player)
+
+    def is_feed_playback(self):
+        """
+        Override this function to return True if the played item belongs to a feed played one after another
+        """
+        return False
+
+    def on_playback_started(self, player):
+        """
+        Override this function to perform some actions once the playback has started
+        @param player: KodiPlayer
+        """
+        pass
+
+    def on_playback_progress(self, player):
+        """
+        Override this function to perform some actions every second of the playback
+        @param player: KodiPlayer
+        """
+        pass
+
+    def on_playback_stopped(self, player):
+        """
+        Override this function to perform some actions after the playback has stopped
+        @param player: KodiPlayer
+        """
+        pass
+
+    def get_playback_metrics(self):
+        return PlaybackMetrics(os.path.join(self.site.data_path, "playback_metrics.json"))
+
+    def resolve_hls_url(self, url):
+        max_height, max_bandwidth = self.get_quality_limits()
+        return HlsResolver(self.site).resolve(url, max_height=max_height, max_bandwidth=max_bandwidth)
+
+    def get_quality_limits(self):
+        """
+        @return: max video height and max bandwidth in bits per second of the quality settings, 0 for no limit
+        """
+        quality = int(self.site.addon.getSetting("quality") or 0)
+        max_bandwidth = int(self.site.addon.getSetting("max_bandwidth") or 0) * 1000 * 1000
+        return QUALITY_HEIGHTS[min(quality, len(QUALITY_HEIGHTS) - 1)], max_bandwidth
+
     def create_element_li(self, element):
         return element
 
@@ -147,30 +339,37 @@ class Page(object):
         if self.is_cache_available():
             return self.get_data_from_cache()
         else:
-            return self.site.request(self.get_load_url(), output="json")
+            return self.site.request(self.get_load_url(), output="json", ttl=self.get_response_ttl(), stale=True)
+
+    def get_response_ttl(self):
+        """
+        Override this function to serve the site responses from the response cache. None disables the cache.
+        @return: time to live of the cached response in seconds
+        """
+        return None
 
     def is_cache_available(self):
+        if not self.cache_enabled:
+            return False
         is_refresh = 'refresh' in self.params and self.params['refresh'] == "true"
         if is_refresh:
-            remove_files_by_pattern(os.path.join(self.site.data_path, "%s*.json" % self.get_cache_filename_prefix()))
-        return (not is_refresh) and self.cache_enabled and \
-               os.path.exists(self.cache_file) and not (self.is_cache_expired())
+            self.site.cache_store.invalidate(self.get_cache_key_prefix())
+            return False
+        self.cache_entry = self.site.cache_store.get(self.cache_key)
+        if self.cache_entry is None:
+            return False
+        if self.is_cache_expired():
+            # the expired entry is shown at once and refreshed after the listing, see revalidate
+            self.cache_stale = self.site.stale_while_revalidate
+            return self.cache_stale
+        return True
 
     def get_data_from_cache(self):
-        with open(self.cache_file, 'r+') as f:
-            xbmc.log("Loading from cache file: %s" % self.cache_file, xbmc.LOGDEBUG)
-            return json.load(f)
+        xbmc.log("Loading from cache: %s" % self.cache_key, xbmc.LOGDEBUG)
+        return json.loads(self.cache_entry.payload)
 
     def is_cache_expired(self):
-
-        if self.cache_expire == 0:
-            # cache never expires
-            return False
-
-        mod_time = os.path.getmtime(self.cache_file)
-        now = time.time()
-
-        return int(now - mod_time) > self.cache_expire
+        return self.site.cache_store.is_expired(self.cache_entry)
 
     def get_nav_url(self, load_url="", offset=0):
         return get_url(self.site.url,
@@ -179,7 +378,8 @@ class Page(object):
                        load_url=load_url, offset=offset, url=self.site.url)
 
     def append_li_for_element(self, element):
-        self.list_items.append(self.create_element_li(element))
+        with tracing.span("create_element_li"):
+            self.list_items.append(self.create_element_li(element))
 
     def set_navigation_pages(self):
         self.offset = int(self.params.get('offset', "0"))
@@ -220,44 +420,61 @@ class Page(object):
         else:
             xbmcplugin.setContent(self.site.handle, self.params['content'] if "content" in self.params else "videos")
 
+        with tracing.span("artwork_wait"):
+            self.site.artwork.prefetch(url for category in self.list_items
+                                       for url in category.get('art', {}).values())
+            # widgets show the cached artwork only, the rest is downloaded for the next time
+            if not self.widget:
+                timeout = ARTWORK_WAIT
+                if self.site.deadline is not None:
+                    # the artwork is not worth showing the listing after the time limit of the invocation
+                    timeout = min(timeout, max(0, self.site.deadline - time.monotonic()))
+                self.site.artwork.wait(timeout=timeout)
+
+        # context menu items shared by all list items
+        shared_menu_items = []
+        if self.cache_enabled and not self.widget:
+            shared_menu_items.append((self.site.language(30001),
+                                      "ActivateWindow(Videos, %s&refresh=true)" % self.get_nav_url(offset=0)))
+
+        use_info_tag = kodi_version_major() >= 20
+
+        directory_items = []
+
         # Iterate through categories
         for category in self.list_items:
 
             if category['label'] == "":
                 continue
             # Create a list item with a text label and a thumbnail image.
-            list_item = xbmcgui.ListItem(label=category['label'])
-
-            url = category['url']
+            list_item = xbmcgui.ListItem(label=category['label'], offscreen=True)
 
-            is_folder = category['is_folder']
             list_item.setProperty('IsPlayable', str(category['is_playable']).lower())
 
-            if self.cache_enabled:
-                self.context_menu_items = [(self.site.language(30001),
-                                            "ActivateWindow(Videos, %s&refresh=true)" %
-                                            self.get_nav_url(offset=0)), ]
-            else:
-                self.context_menu_items.clear()
+            self.context_menu_items = list(shared_menu_items)
 
-            self.add_context_menu(category)
+            if not self.widget:
+                self.add_context_menu(category)
 
             if self.context_menu_items:
                 list_item.addContextMenuItems(self.context_menu_items)
 
             if 'info' in category:
-                list_item.setInfo(category['type'] if 'type' in category else "video", category['info'])
+                set_info(list_item, category['info'], category.get('type', "video"), use_info_tag)
 
             if 'art' in category:
-                list_item.setArt(category['art'])
+                list_item.setArt(self.site.artwork.localize(category['art']))
 
             if 'cast' in category:
                 list_item.setCast(category['cast'])
 
-            xbmcplugin.addDirectoryItem(self.site.handle, url, list_item, is_folder)
+            directory_items.append((category['url'], list_item, category['is_folder']))
+
+        xbmcplugin.addDirectoryItems(self.site.handle, directory_items, len(directory_items))
 
         # Finish creating a virtual folder.
-        xbmcplugin.endOfDirectory(self.site.handle, cacheToDisc=False)
+        with tracing.span("end_of_directory"):
+            xbmcplugin.endOfDirectory(self.site.handle, cacheToDisc=False)
 
     def enrich_info_tag(self, list_item, episode, brand):
         """
@@ -278,20 +495,16 @@ class Page(object):
         pass
 
     def save_brand_to_history(self, brand):
-        with open(os.path.join(self.site.history_path, "brand_%s.json" % brand['id']), 'w+') as f:
-            json.dump(brand, f)
+        statefile.save_json(os.path.join(self.site.history_path, "brand_%s.json" % brand['id']), brand)
 
     def cache_data(self):
-        if self.cache_enabled and len(self.data.get('data', [])) > 0 and \
-                not (os.path.exists(self.cache_file) and not self.is_cache_expired()):
-            with open(self.cache_file, 'w+') as f:
-                json.dump(self.data, f)
-
-    def get_cache_filename(self):
-        return os.path.join(self.site.data_path,
-                            "%s_%s_%s.json" % (self.get_cache_filename_prefix(),
-                                               self.limit,
-                                               self.offset))
-
-    def get_cache_filename_prefix(self):
+        if self.cache_enabled and len(self.data.get('data', [])) > 0 and not self.cache_stale and \
+                not (self.cache_entry and not self.is_cache_expired()):
+            self.site.cache_store.put(self.cache_key, self.get_cache_key_prefix(), json.dumps(self.data),
+                                      expire=self.cache_expire)
+
+    def get_cache_key(self):
+        return "%s_%s_%s" % (self.get_cache_key_prefix(), self.limit, self.offset)
+
+    def get_cache_key_prefix(self):
         return self.context
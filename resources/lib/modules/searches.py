@@ -3,13 +3,14 @@
 # Author: Alex Bratchik
 # Created on: 03.04.2021
 # License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
-import json
 import os
 
 import xbmc
 
 import resources.lib.modules.pages as pages
+import resources.lib.modules.videos as videos
 from resources.lib.kodiutils import get_url
+from resources.lib.searchhistory import SearchHistory
 
 
 class Search(pages.Page):
@@ -17,6 +18,8 @@ class Search(pages.Page):
     def __init__(self, site):
         super(Search, self).__init__(site)
         self.search_history_file = os.path.join(self.site.data_path, "search_history.json")
+        self.history = SearchHistory(self.search_history_file,
+                                     max_size=int(self.site.addon.getSetting("search_history_size") or 50))
 
     def create_root_li(self):
         return self.create_menu_li("search", 30010, is_folder=True, is_playable=False,
@@ -30,6 +33,14 @@ class Search(pages.Page):
                                                                action="search",
                                                                context="videos",
                                                                url=self.site.url)))
+        if self.site.addon.getSetting("local_index") != "false":
+            self.list_items.append(self.create_menu_li("search", 30013,
+                                                       is_folder=True, is_playable=False,
+                                                       url=get_url(self.site.url,
+                                                                   action="search_local",
+                                                                   context="searches",
+                                                                   url=self.site.url),
+                                                       info={'plot': self.site.language(30014)}))
 
     def set_context_title(self):
         self.site.context_title = self.site.language(30010)
@@ -50,13 +61,8 @@ class Search(pages.Page):
                 }
 
     def get_data_query(self):
-        if os.path.exists(self.search_history_file):
-            self.limit = 20
-            with open(self.search_history_file, 'r+') as f:
-                sh = json.load(f)
-                return {'data': sh[:self.limit]}
-        else:
-            return {'data': []}
+        self.limit = 20
+        return {'data': self.history.items(self.limit)}
 
     def create_new_search_element(self):
         return {'id': 'newsearch',
@@ -64,19 +70,10 @@ class Search(pages.Page):
                 'is_new': "true"}
 
     def save_to_history(self, keyword):
-        sh = self.get_data_query().get('data',[])
-        pos = next((i for i, item in enumerate(sh) if item['title'] == keyword), -1)
-        if pos < 0:
-            index = sh[0]['id'] + 1 if len(sh) > 0 else 1
-            sh.insert(0, {'id': index,
-                          'title': keyword,
-                          'is_new': "false"})
-        else:
-            sh.insert(0, sh[pos])
-            sh.pop(pos + 1)
-
-        with open(self.search_history_file, 'w+') as f:
-            json.dump(sh, f)
+        self.history.add(keyword)
+
+    def get_suggestions(self, keyword):
+        return self.history.suggest(keyword)
 
     def get_nav_url(self, load_url="", offset=0):
         return get_url(self.site.url, action="load", context="searches", url=self.site.url)
@@ -89,8 +86,28 @@ class Search(pages.Page):
                                                 context="searches",
                                                 url=self.site.url)))
 
+    def search_local(self):
+        keyword = self.params.get('search', "")
+        if not keyword:
+            keyword = self.site.get_user_input()
+            if keyword:
+                xbmc.executebuiltin("Container.Update(%s)" % get_url(self.site.url,
+                                                                     action="search_local",
+                                                                     context="searches",
+                                                                     search=keyword,
+                                                                     url=self.site.url))
+            return
+
+        elements = self.site.local_index.search(keyword)
+        xbmc.log("Found %s items in the local index" % len(elements), xbmc.LOGDEBUG)
+
+        video = videos.Video(self.site)
+        video.list_items = [video.create_element_li(element) for element in elements]
+        self.site.context_title = "%s: %s" % (self.site.language(30013), keyword)
+        video.show_list_items()
+
     def clear_history(self):
         if os.path.exists(self.search_history_file):
-            os.remove(self.search_history_file)
+            self.history.clear()
             url = self.get_nav_url(offset=0)
             xbmc.executebuiltin("Container.Update(%s)" % url)
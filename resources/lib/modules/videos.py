@@ -5,17 +5,30 @@
 # License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
 
 import json
-import gzip
+import queue
+import threading
 import xbmc
+import xbmcgui
 
 import resources.lib.modules.pages as pages
-from resources.lib.kodiutils import get_url, clean_html
+from resources.lib.hls import HlsResolver
+from resources.lib.kodiutils import get_url, clean_html, upnext_signal
+
+# seconds before the end of the video to pre-resolve the next one, within the manifest ttl of the response cache
+PRERESOLVE_BEFORE = 45
+# seconds to let the pre-resolution complete its request after the playback has stopped
+PRERESOLVE_JOIN = 1
 
 
 class Video(pages.Page):
     def __init__(self, site):
         super(Video, self).__init__(site)
         self.search_text = ""
+        self.autoplay = self.site.addon.getSetting("autoplay") == "true"
+        self.next_element = None
+        self.next_feed = ""
+        self.preresolver = None
+        self.playback_stopped = threading.Event()
 
     def search(self):
         if not ('search' in self.params):
@@ -23,6 +36,14 @@ class Video(pages.Page):
             if self.search_text:
                 import resources.lib.modules.searches as searches
                 search = searches.Search(self.site)
+
+                suggestions = [s for s in search.get_suggestions(self.search_text) if s != self.search_text]
+                if suggestions:
+                    choice = xbmcgui.Dialog().select(self.site.language(30010), [self.search_text] + suggestions)
+                    if choice < 0:
+                        return
+                    self.search_text = ([self.search_text] + suggestions)[choice]
+
                 search.save_to_history(self.search_text)
 
                 url = self.get_nav_url()
@@ -35,19 +56,23 @@ class Video(pages.Page):
         self.load()
 
     def get_nav_url(self, load_url="", offset=0):
-        if self.params.get('load_url', ""):
+        if self.action == "search" and self.search_text:
+            params = {'search': self.search_text}
+            if load_url:
+                params.update(load_url=load_url, offset=offset)
             return get_url(self.site.url,
                            context="videos",
                            content="videos",
-                           action="load",
-                           load_url=self.params.get('load_url', ""),
-                           url=self.site.url)
-        elif self.action == "search" and self.search_text:
+                           action="search",
+                           url=self.site.url,
+                           **params)
+        elif load_url or self.params.get('load_url', ""):
             return get_url(self.site.url,
                            context="videos",
                            content="videos",
-                           action="search",
-                           search=self.search_text,
+                           action="load",
+                           load_url=load_url or self.params['load_url'],
+                           offset=offset if load_url else self.params.get('offset', 0),
                            url=self.site.url)
         else:
             return get_url(self.site.url,
@@ -67,28 +92,83 @@ class Video(pages.Page):
 
     def get_data_query(self):
         xbmc.log("Loading data from %s" % self.get_load_url(), xbmc.LOGDEBUG)
-        data = self.site.request(self.get_load_url(), output="json")
+        data = self.site.request(self.get_load_url(), output="json", ttl=self.get_response_ttl(), stale=True)
 
         if data.get('items', []):
-            return {'data': data['items'],
-                    'pagination': {'next': data.get('more', {}).get('link'),
-                                   'prev': data.get('prev', {}).get('link')
-                                   }
-                    }
+            self.prefetch_artwork(data['items'])
+            result = {'data': data['items'],
+                      'pagination': {'next': data.get('more', {}).get('link'),
+                                     'prev': data.get('prev', {}).get('link')
+                                     }
+                      }
+            items_per_screen = int(self.site.addon.getSetting("items_per_screen") or 0)
+            if items_per_screen > len(data['items']) and result['pagination']['next'] and not self.widget:
+                result['data'] = self.iterate_pages(data['items'], result['pagination'], items_per_screen)
+            return result
 
         return {'data': []}
 
+    def iterate_pages(self, items, pagination, items_per_screen):
+        """
+        Yields the elements of the loaded page followed by the ones of the next pages until items_per_screen of
+        them are yielded. The next page is downloaded and decoded in the background while the elements of the
+        current one are processed.
+        @param items: elements of the loaded page
+        @param pagination: pagination of the loaded page, its next link is moved along with the merged pages
+        @param items_per_screen: minimum number of the elements to yield
+        """
+        pages = queue.Queue(maxsize=1)
+
+        def fetch(url, count):
+            try:
+                while url and count < items_per_screen:
+                    data = self.site.request(url, output="json", ttl=self.get_response_ttl())
+                    if not data.get('items', []):
+                        break
+                    self.prefetch_artwork(data['items'])
+                    pages.put(data)
+                    count += len(data['items'])
+                    url = data.get('more', {}).get('link')
+            finally:
+                pages.put(None)
+
+        threading.Thread(target=fetch, args=(pagination['next'], len(items)), daemon=True).start()
+
+        while items:
+            for item in items:
+                yield item
+            data = pages.get()
+            if data is None:
+                break
+            xbmc.log("Merged the page %s" % pagination['next'], xbmc.LOGDEBUG)
+            pagination['next'] = data.get('more', {}).get('link')
+            items = data['items']
+
+    def afterload(self):
+        if self.site.addon.getSetting("local_index") != "false":
+            self.site.local_index.add(self.data.get('data', []))
+        super(Video, self).afterload()
+
+    def prefetch_page(self, url):
+        data = self.site.request(url, output="json", ttl=self.get_response_ttl())
+        self.prefetch_artwork(data.get('items', []))
+        return data.get('more', {}).get('link')
+
+    def prefetch_artwork(self, items):
+        self.site.artwork.prefetch(item.get(key, "") for item in items
+                                   for key in ('image', 'image_squared', 'big_card_image'))
+
+    def get_response_ttl(self):
+        setting = "search_cache_ttl" if self.params.get('search', "") else "videos_cache_ttl"
+        return int(self.site.addon.getSetting(setting) or 0) * 60
+
     def create_element_li(self, element):
         title = clean_html(element.get('title',""))
         return {'id': element.get('id', ""),
                 'label': title,
                 'is_folder': False,
                 'is_playable': True,
-                'url': get_url(self.site.url,
-                               action="play",
-                               context=self.context,
-                               spath=element.get('video', {}).get('id', ""),
-                               url=self.site.url),
+                'url': self.get_play_url(element, self.get_load_url() if self.is_feed_shown() else ""),
                 'info': {'mediatype': "movie",
                          'plot': "[B]%s[/B]\n\n%s" % (element.get('domain',""), title)},
                 'art': {'thumb': element.get('image', ""),
@@ -105,7 +185,115 @@ class Video(pages.Page):
                                                url=self.site.url),
                                    info={'plot': self.site.language(30120)})
 
+    def get_play_url(self, element, feed=""):
+        """
+        @param element: element of the feed
+        @param feed: url of the feed page containing the element, to play the feed one video after another
+        """
+        params = {'action': "play",
+                  'context': "videos",
+                  'spath': element.get('video', {}).get('id', ""),
+                  'url': self.site.url}
+        if feed:
+            params['feed'] = feed
+        return get_url(self.site.url, **params)
+
+    def is_feed_shown(self):
+        return self.autoplay and self.context == "videos"
+
     def play(self):
         spath = self.params['spath']
 
         self.play_url(spath)
+
+    def is_feed_playback(self):
+        return self.autoplay and bool(self.params.get('feed', ""))
+
+    def find_next_element(self):
+        """
+        Looks up the element following the played one in its feed page or at the top of the next page
+        @return: tuple of the element and the url of the feed page containing it, (None, "") if there is none
+        """
+        feed = self.params['feed']
+        spath = self.params['spath']
+        data = self.site.request(feed, output="json", ttl=self.get_response_ttl())
+        items = data.get('items', [])
+        ids = [item.get('video', {}).get('id', "") for item in items]
+        if spath not in ids:
+            xbmc.log("Played video is not found in the feed %s" % feed, xbmc.LOGDEBUG)
+            return None, ""
+
+        index = ids.index(spath) + 1
+        if index < len(items):
+            return items[index], feed
+
+        next_feed = data.get('more', {}).get('link')
+        if next_feed:
+            items = self.site.request(next_feed, output="json", ttl=self.get_response_ttl()).get('items', [])
+            if items:
+                return items[0], next_feed
+        return None, ""
+
+    def create_upnext_episode(self, element):
+        title = clean_html(element.get('title', ""))
+        return {'episodeid': element.get('id', ""),
+                'tvshowid': "",
+                'title': title,
+                'showtitle': element.get('domain', ""),
+                'plot': title,
+                'art': {'thumb': element.get('image', ""),
+                        'tvshow.fanart': element.get('big_card_image', ""),
+                        'tvshow.poster': element.get('big_card_image', "")}}
+
+    def on_playback_started(self, player):
+        self.next_element, self.next_feed = self.find_next_element()
+        if self.next_element is None:
+            return
+
+        xbmc.log("Up next: %s" % self.next_element.get('video', {}).get('id', ""), xbmc.LOGDEBUG)
+        self.prefetch_artwork([self.next_element])
+        upnext_signal(self.site.id, {'current_episode': {'episodeid': self.params['spath'],
+                                                         'tvshowid': "",
+                                                         'title': ""},
+                                     'next_episode': self.create_upnext_episode(self.next_element),
+                                     'play_url': self.get_play_url(self.next_element, self.next_feed)})
+
+    def on_playback_progress(self, player):
+        if self.next_element is None or self.preresolver is not None:
+            return
+        try:
+            remaining = player.getTotalTime() - player.getTime()
+        except RuntimeError:
+            return
+        if 0 < remaining <= PRERESOLVE_BEFORE:
+            # the single next video only
+            self.preresolver = threading.Thread(target=self.preresolve,
+                                                args=(self.next_element.get('video', {}).get('id', ""),),
+                                                daemon=True)
+            self.preresolver.start()
+
+    def on_playback_stopped(self, player):
+        self.playback_stopped.set()
+        if self.preresolver is not None and self.preresolver.is_alive():
+            self.preresolver.join(PRERESOLVE_JOIN)
+            if self.preresolver.is_alive():
+                xbmc.log("Playback stopped, dropping the pre-resolution of the next video", xbmc.LOGDEBUG)
+
+    def preresolve(self, url):
+        """
+        Fetches the master playlist of the next video into the response cache, so the next play action selects its
+        variant without a request. In the auto quality mode the play action passes the master playlist url to
+        inputstream.adaptive, which fetches the playlists itself, so there is nothing to pre-resolve.
+        """
+        if '.m3u8' not in url or self.playback_stopped.is_set():
+            return
+        max_height, max_bandwidth = self.get_quality_limits()
+        if not (max_height or max_bandwidth):
+            xbmc.log("Auto quality, the next video is not pre-resolved", xbmc.LOGDEBUG)
+            return
+        xbmc.log("Pre-resolving %s" % url, xbmc.LOGDEBUG)
+        variant = HlsResolver(self.site).resolve(url, max_height=max_height, max_bandwidth=max_bandwidth)
+        if self.playback_stopped.is_set():
+            xbmc.log("Playback stopped while pre-resolving %s" % url, xbmc.LOGDEBUG)
+        elif variant != url:
+            xbmc.log("Pre-resolved %s" % variant, xbmc.LOGDEBUG)
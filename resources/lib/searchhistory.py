@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Module: searchhistory
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import bisect
+import os
+
+from collections import OrderedDict
+
+from resources.lib import statefile
+
+
+class SearchHistory(object):
+    """
+    Search history capped to max_size keywords, the most recent first. Keywords are deduplicated by their
+    normalized form and indexed for the prefix lookup of suggestions. The number of the searches of every keyword
+    is counted.
+    """
+
+    def __init__(self, path, max_size=50):
+        self.path = path
+        self.max_size = max_size
+        self._entries = None
+        self._keys = []
+        self._last_id = 0
+
+    @staticmethod
+    def get_key(keyword):
+        return " ".join(keyword.casefold().split())
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self.load()
+        return self._entries
+
+    def load(self):
+        self._entries = OrderedDict()
+        for element in statefile.load_json(self.path, []):
+            key = self.get_key(element['title'])
+            if key not in self._entries:
+                self._entries[key] = element
+                self._last_id = max(self._last_id, element['id'])
+        self._keys = sorted(self._entries)
+        self._trim()
+
+    def save(self):
+        statefile.save_json(self.path, list(self.entries.values()))
+
+    def items(self, limit=0):
+        items = list(self.entries.values())
+        return items[:limit] if limit else items
+
+    def most_used(self, limit=0):
+        """
+        Returns the entries searched the most times, the most recent first among the equally used ones
+        """
+        items = sorted(self.entries.values(), key=lambda element: element.get('count', 1), reverse=True)
+        return items[:limit] if limit else items
+
+    def add(self, keyword):
+        """
+        Adds the keyword to the top of the history or moves it there and counts the search if it has been searched
+        before
+        """
+        key = self.get_key(keyword)
+        with statefile.locked(self.path):
+            # the history could have been changed by another plugin process
+            self.load()
+            if key in self.entries:
+                element = self.entries[key]
+                element['count'] = element.get('count', 1) + 1
+                self.entries.move_to_end(key, last=False)
+            else:
+                self._last_id += 1
+                self.entries[key] = {'id': self._last_id,
+                                     'title': keyword,
+                                     'is_new': "false",
+                                     'count': 1}
+                self.entries.move_to_end(key, last=False)
+                bisect.insort(self._keys, key)
+                self._trim()
+            self.save()
+
+    def suggest(self, prefix, limit=10):
+        """
+        Returns the keywords starting with prefix, the most recent first
+        """
+        key = self.get_key(prefix)
+        entries = self.entries
+        matches = set()
+        for k in self._keys[bisect.bisect_left(self._keys, key):]:
+            if not k.startswith(key):
+                break
+            matches.add(k)
+        return [element['title'] for k, element in entries.items() if k in matches][:limit]
+
+    def clear(self):
+        self._entries = OrderedDict()
+        self._keys = []
+        with statefile.locked(self.path):
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _trim(self):
+        while len(self._entries) > self.max_size:
+            key, element = self._entries.popitem(last=True)
+            del self._keys[bisect.bisect_left(self._keys, key)]
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Module: serviceclient
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Client side of the background service. It is imported by every plugin invocation, so the server side stays in
+httpservice, which is imported by the service only.
+"""
+import json
+import socket
+
+import xbmc
+import xbmcgui
+
+PORT_PROPERTY = "plugin.video.yandex.zen.service_port"
+HOME_WINDOW = 10000
+LOCALHOST = "127.0.0.1"
+
+
+class ServiceResponse(object):
+    """
+    Minimal response object returned by the ServiceClient, compatible with the part of requests.Response
+    used by the addon.
+    """
+
+    def __init__(self, meta, content):
+        self.status_code = meta.get('status_code', 0)
+        self.encoding = meta.get('encoding') or "utf-8"
+        self.content = content
+        # imported on demand, the email package is only needed once a response is received
+        from email.message import Message
+        self.headers = Message()
+        for key, value in meta.get('headers', {}).items():
+            self.headers[key] = value
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ServiceClient(object):
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+
+    @staticmethod
+    def get_port():
+        port = xbmcgui.Window(HOME_WINDOW).getProperty(PORT_PROPERTY)
+        return int(port) if port else 0
+
+    def is_alive(self):
+        return self.get_port() > 0
+
+    def get(self, url, headers=None, timeout=None):
+        """
+        Sends the GET request through the background service.
+        @param url: url to query
+        @param headers: optional request headers
+        @param timeout: seconds to wait for the response if shorter than the client timeout
+        @return: ServiceResponse or None if the service is not available
+        @raise IOError: if the request has been sent, but the response has not been received
+        """
+        port = self.get_port()
+        if not port:
+            return None
+        try:
+            sock = socket.create_connection((LOCALHOST, port), timeout=min(self.timeout, timeout or self.timeout))
+        except OSError as e:
+            xbmc.log("Service is not available: %s" % e, xbmc.LOGWARNING)
+            return None
+        with sock:
+            try:
+                f = sock.makefile("rwb")
+                f.write(json.dumps({'url': url, 'headers': headers}).encode() + b"\n")
+                f.flush()
+                meta = json.loads(f.readline())
+                content = f.read(meta.get('length', 0))
+                return ServiceResponse(meta, content)
+            except (OSError, ValueError) as e:
+                # the service could still be querying the site, so the request is not sent again
+                raise IOError("Service request %s failed: %s" % (url, e))
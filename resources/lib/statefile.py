@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Module: statefile
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Storage of the addon state files shared by the concurrent plugin processes. Files are replaced atomically, so that
+a reader never sees a partial write, read-modify-write cycles are serialized with an advisory lock file and the
+files, which can't be decoded, are moved aside instead of breaking the next launch.
+"""
+import json
+import os
+import pickle
+import time
+
+from contextlib import contextmanager
+
+import xbmc
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# seconds between the attempts to take the lock, which is waited for with a timeout
+POLL_INTERVAL = 0.05
+
+
+@contextmanager
+def locked(path, timeout=None):
+    """
+    Holds the exclusive advisory lock of the state file
+    @param path: path of the state file, the lock is taken on the path.lock file next to it
+    @param timeout: seconds to wait for the lock, None to wait without a limit
+    @return: context manager yielding True if the lock is held or False if the timeout has expired
+    """
+    with open(path + ".lock", 'a+') as f:
+        is_locked = _lock(f) if timeout is None else _try_lock(f, timeout)
+        try:
+            yield is_locked
+        finally:
+            if is_locked:
+                _unlock(f)
+
+
+def _lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        # retries for 10 seconds before raising OSError
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    return True
+
+
+def _try_lock(f, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_atomic(path, data):
+    """
+    Writes the bytes to the temporary file and renames it over the path
+    """
+    tmp_path = "%s.%s.tmp" % (path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read(path, decode, default=None):
+    """
+    Reads and decodes the file
+    @param path: path of the file
+    @param decode: function decoding the bytes
+    @param default: value returned if the file does not exist or is corrupt
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return default
+    try:
+        return decode(data)
+    except Exception as e:
+        xbmc.log("State file %s is corrupt: %s" % (path, e), xbmc.LOGWARNING)
+        try:
+            os.replace(path, path + ".corrupt")
+        except OSError:
+            pass
+        return default
+
+
+def load_json(path, default=None):
+    return read(path, lambda data: json.loads(data.decode("utf-8")), default)
+
+
+def save_json(path, value):
+    write_atomic(path, json.dumps(value).encode("utf-8"))
+
+
+def load_pickle(path, default=None):
+    return read(path, pickle.loads, default)
+
+
+def save_pickle(path, value):
+    write_atomic(path, pickle.dumps(value))
+
+
+def update_json(path, update, default=None):
+    """
+    Loads, updates and saves the JSON file under its lock
+    @param path: path of the file
+    @param update: function returning the new value for the loaded one
+    @param default: value passed to update if the file does not exist or is corrupt
+    @return: the saved value
+    """
+    with locked(path):
+        value = update(load_json(path, default))
+        save_json(path, value)
+    return value
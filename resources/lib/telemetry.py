@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Module: telemetry
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import time
+
+from urllib.parse import urlsplit
+
+import xbmc
+
+from resources.lib import statefile
+
+
+def percentile(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+class PlaybackMetrics(object):
+    """
+    Rolling store of the playback records, keeps the last max_records of them
+    """
+
+    def __init__(self, path, max_records=500):
+        self.path = path
+        self.max_records = max_records
+
+    def get_records(self):
+        return statefile.load_json(self.path, [])
+
+    def add(self, record):
+        statefile.update_json(self.path, lambda records: (records + [record])[-self.max_records:], [])
+
+    def get_summary(self):
+        records = self.get_records()
+        started = [r for r in records if not r['error']]
+        summary = {'count': len(records),
+                   'errors': len(records) - len(started),
+                   'stalls': sum(r['stalls'] for r in records),
+                   'resolve_p50': percentile([r['resolve'] for r in records], 50),
+                   'resolve_p95': percentile([r['resolve'] for r in records], 95),
+                   'start_p50': percentile([r['start'] for r in started], 50),
+                   'start_p95': percentile([r['start'] for r in started], 95),
+                   'hosts': {}}
+        for r in records:
+            host = summary['hosts'].setdefault(r['host'], {'count': 0, 'errors': 0, 'start': []})
+            host['count'] += 1
+            host['errors'] += 1 if r['error'] else 0
+            if not r['error']:
+                host['start'].append(r['start'])
+        for host in summary['hosts'].values():
+            host['start_p50'] = percentile(host.pop('start'), 50)
+        return summary
+
+
+class PlaybackTracker(object):
+    """
+    Tracks the playback started by the plugin and records its start latency, stalls and errors
+    """
+
+    def __init__(self, metrics, video_id, url, started, resolved):
+        """
+        @param metrics: PlaybackMetrics to add the record to
+        @param video_id: id of the played video
+        @param url: resolved stream url
+        @param started: monotonic time the play action has started
+        @param resolved: monotonic time the url has been resolved
+        """
+        self.metrics = metrics
+        self.record = {'id': video_id,
+                       'host': urlsplit(url).netloc,
+                       'time': time.time(),
+                       'resolve': round(resolved - started, 3),
+                       'start': 0,
+                       'stalls': 0,
+                       'error': False}
+        self.started = started
+        self.caching = False
+
+    def start(self, player, is_playing):
+        self.record['start'] = round((player.started_at or time.monotonic()) - self.started, 3)
+        self.record['error'] = not is_playing
+
+    def update(self):
+        is_caching = xbmc.getCondVisibility("Player.Caching")
+        if is_caching and not self.caching:
+            self.record['stalls'] += 1
+        self.caching = is_caching
+
+    def stop(self, player):
+        self.record['error'] = self.record['error'] or player.has_error
+        xbmc.log("Playback metrics: %s" % self.record, xbmc.LOGDEBUG)
+        self.metrics.add(self.record)
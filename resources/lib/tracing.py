@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Module: tracing
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Lightweight tracing of the plugin invocation. Phases are wrapped in named spans, which are aggregated by name and
+appended to a rolling JSON lines file when the invocation ends. When tracing is not enabled, span returns a shared
+no-op context manager.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+import xbmc
+
+from resources.lib import statefile
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+MAX_LINES = 1000
+
+_enabled = False
+_trace_file = ""
+_origin = 0
+_spans = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class _NoopSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        _local.depth = getattr(_local, 'depth', 0) + 1
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end = time.monotonic()
+        _local.depth -= 1
+        with _lock:
+            _spans.append((self.name, _local.depth, self.start - _origin, end - self.start))
+        return False
+
+
+def enable(trace_file):
+    global _enabled, _trace_file, _origin
+    _enabled = True
+    _trace_file = trace_file
+    _origin = time.monotonic()
+
+
+def is_enabled():
+    return _enabled
+
+
+def span(name):
+    """
+    Returns the context manager measuring the named phase
+    @param name: name of the phase
+    """
+    return _Span(name) if _enabled else _NOOP_SPAN
+
+
+def flush(context="", action=""):
+    """
+    Appends the spans of the invocation to the trace file, aggregated by name
+    """
+    global _spans
+    if not _enabled:
+        return
+    with _lock:
+        spans, _spans = _spans, []
+
+    aggregated = {}
+    for name, depth, start, duration in spans:
+        s = aggregated.setdefault(name, {'name': name, 'depth': depth, 'start': round(start * 1000, 1),
+                                         'count': 0, 'ms': 0})
+        s['count'] += 1
+        s['ms'] += duration * 1000
+    for s in aggregated.values():
+        s['ms'] = round(s['ms'], 1)
+
+    trace = {'time': time.time(),
+             'context': context,
+             'action': action,
+             'ms': round((time.monotonic() - _origin) * 1000, 1),
+             'max_rss_kb': get_max_rss(),
+             'spans': sorted(aggregated.values(), key=lambda s: s['start'])}
+
+    try:
+        with statefile.locked(_trace_file):
+            lines = []
+            if os.path.exists(_trace_file):
+                with open(_trace_file, 'r') as f:
+                    lines = f.readlines()
+            lines.append(json.dumps(trace) + "\n")
+            statefile.write_atomic(_trace_file, "".join(lines[-MAX_LINES:]).encode("utf-8"))
+    except OSError as e:
+        xbmc.log("Failed to write trace %s: %s" % (_trace_file, e), xbmc.LOGWARNING)
+
+
+def get_max_rss():
+    """
+    Returns the peak resident memory of the process in kilobytes or 0 if it is not available
+    """
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def load_traces(trace_file):
+    traces = []
+    if os.path.exists(trace_file):
+        with open(trace_file, 'r') as f:
+            for line in f:
+                try:
+                    traces.append(json.loads(line))
+                except ValueError:
+                    continue
+    return traces
+
+
+def get_report(trace_file):
+    """
+    Aggregates the traces by context, action and span name
+    @return: dictionary "context.action" -> {'count', 'ms': [...], 'max_rss_kb': [...], 'spans': {name: [ms, ...]}}
+    """
+    report = {}
+    for trace in load_traces(trace_file):
+        entry = report.setdefault("%s.%s" % (trace['context'], trace['action']),
+                                  {'count': 0, 'ms': [], 'max_rss_kb': [], 'spans': {}})
+        entry['count'] += 1
+        entry['ms'].append(trace['ms'])
+        entry['max_rss_kb'].append(trace.get('max_rss_kb', 0))
+        for s in trace['spans']:
+            entry['spans'].setdefault(s['name'], []).append(s['ms'])
+    return report
@@ -3,18 +3,63 @@
 # Author: Alex Bratchik
 # Created on: 03.04.2021
 # License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
-import json
 import os
-import pickle
-
-import requests
+import threading
 
 import xbmc
 
+from resources.lib import statefile
+from resources.lib import tracing
 from resources.lib.yandexzen import USER_AGENT
 
 NEVER = 100 * 1000 * 60 * 60 * 24
 
+POOL_SIZE = 10
+RETRY_STATUSES = (500, 502, 503, 504)
+RETRY_BACKOFF = 0.5
+
+# cookie issued to the registered client
+CLIENT_COOKIE = "_yasc"
+
+
+class CookieStore(object):
+    """
+    Persists the cookie jar. The jar is written only if it has changed since it was loaded or saved.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fingerprint = None
+
+    @staticmethod
+    def get_fingerprint(jar):
+        return sorted((c.domain, c.path, c.name, c.value, c.expires) for c in jar)
+
+    @staticmethod
+    def has_valid_cookie(jar, name):
+        return any(c.name == name and not c.is_expired() for c in jar)
+
+    def load(self, jar):
+        for c in statefile.load_pickle(self.path, []):
+            xbmc.log(str(c), xbmc.LOGDEBUG)
+            jar.set_cookie(c)
+        self._fingerprint = self.get_fingerprint(jar)
+        jar.clear_expired_cookies()
+
+    def save(self, jar):
+        """
+        Writes the jar if it has changed
+        @return: True if the jar has been written
+        """
+        fingerprint = self.get_fingerprint(jar)
+        if fingerprint == self._fingerprint:
+            return False
+        with statefile.locked(self.path):
+            statefile.save_pickle(self.path, jar)
+        self._fingerprint = fingerprint
+        xbmc.log("Cookies saved to %s" % self.path, xbmc.LOGDEBUG)
+        return True
+
 
 class User:
     def __init__(self):
@@ -26,8 +71,14 @@ class User:
         self.session = None
 
         self._headers = {}
+        self._session_lock = threading.Lock()
+        self._timeout = None
+        self._retries = 0
+        # session without retries for the requests close to the deadline, shares the cookies with the session
+        self._single_try_session = None
 
         self._cookies_file = ""
+        self._cookie_store = None
         self.users_file = ""
         self.user_data = []
         self.usr = {}
@@ -44,7 +95,8 @@ class User:
         self.users_file = os.path.join(self._site.data_path, "users.json")
         self.domain = site.domain
 
-        self.session = requests.Session()
+        self._timeout = (int(site.addon.getSetting("connect_timeout") or 5),
+                         int(site.addon.getSetting("read_timeout") or 20))
 
         self._headers = {
             'User-Agent': USER_AGENT,
@@ -58,14 +110,31 @@ class User:
             'Sec-GPC': "1",
             'Upgrade-Insecure-Requests': "1"}
 
-        # Load saved cookies
         self._cookies_file = os.path.join(self._site.data_path, "cookies.dat")
-        self._load_cookies()
+        self._cookie_store = CookieStore(self._cookies_file)
+
+        # The session is not needed for offline actions and is opened by the background service if it is running
+        if not (site.is_offline_action() or (site.service and site.service.is_alive())):
+            self._open_session()
 
-        # If UID not in cookies, request it
-        if not ('_yasc' in self.session.cookies):
+    def _open_session(self):
+        # gzip and deflate plus br and zstd if the runtime can decode them
+        from urllib3.util.request import ACCEPT_ENCODING
+
+        self._headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+        self._retries = int(self._site.addon.getSetting("http_retries") or 0)
+        self.session = self._create_session(self._retries)
+
+        # Load saved cookies
+        with tracing.span("load_cookies"):
+            self._load_cookies()
+
+        # If UID not in cookies or expired, request it
+        if not CookieStore.has_valid_cookie(self.session.cookies, CLIENT_COOKIE):
             xbmc.log("Cookie file not found or missing UID, requesting from %s" % self.domain, xbmc.LOGDEBUG)
-            self._register_client()
+            with tracing.span("register_client"):
+                self._register_client()
             self._save_cookies()
 
     def watch(self, site, context=""):
@@ -76,16 +145,67 @@ class User:
         @param site: assumed YandexZen class
         @param context: context to load. If empty then site will use CLI arguments
         """
+        site.parse_params(context)
+
         self.init_session(site)
 
         if self._login():
-            site.show_to(self, context)
+            site.show_to(self)
+
+        self.close_session()
+        site.close()
+
+    def start_session(self, site):
+        """
+        Opens the long-lived session used by the background service
+        @param site: assumed YandexZen class
+        @return: True if login was successful
+        """
+        self.init_session(site)
+        if self.session is None:
+            self._open_session()
+        return self._login()
+
+    @staticmethod
+    def _create_session(retries):
+        # imported on demand to save the startup time of the offline actions
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE,
+                              max_retries=Retry(total=retries,
+                                                backoff_factor=RETRY_BACKOFF,
+                                                status_forcelist=RETRY_STATUSES,
+                                                raise_on_status=False))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_retry_time(self):
+        """
+        @return: seconds the retries of a request can take at least, their backoff and the connect timeouts
+        """
+        # urllib3 retries the first time at once and doubles the backoff from the second time on
+        backoff = sum(RETRY_BACKOFF * 2 ** (n - 1) for n in range(2, self._retries + 1))
+        return backoff + self._retries * self._timeout[0]
 
-        self._save_cookies()
-        self.session.close()
+    def close_session(self):
+        if self.session is not None:
+            self._save_cookies()
+            self.session.close()
+            self.session = None
+        if self._single_try_session is not None:
+            self._single_try_session.close()
+            self._single_try_session = None
 
     def _login(self):
 
+        if self.session is None:
+            # no session for the offline actions, otherwise login is handled by the background service
+            return True
+
         if not self.yandex_login:
             self._logout()
             return True
@@ -99,7 +219,6 @@ class User:
                                          expires=NEVER,
                                          domain=self._site.id,
                                          path="/")
-                self._save_cookies()
 
         if self._is_login():
             return True
@@ -116,19 +235,37 @@ class User:
         else:
             return ""
 
-    def get_http(self, url, headers=None, stream=False):
-        self._set_host(url)
-        if headers is None:
-            headers = self._headers
-        xbmc.log(str(headers), xbmc.LOGDEBUG)
-        if stream:
-            return self.session.get(url, headers=headers, stream=True)
-        else:
-            return self.session.get(url, headers=headers)
-
-    def _set_host(self, url):
-        host = url.split("://")[1].split("/")[0]
-        self._headers.update({'Host': host})
+    def get_http(self, url, headers=None, stream=False, max_timeout=None):
+        """
+        Queries the url with the session, safe to be called from multiple threads
+        @param url: url to query
+        @param headers: optional headers added to the session headers of this request
+        @param stream: True to stream the response content
+        @param max_timeout: seconds limiting the connect and read timeouts of this request
+        @return: requests.Response
+        """
+        with self._session_lock:
+            if self.session is None:
+                self._open_session()
+            session = self.session
+            if max_timeout is not None and self._retries and max_timeout < self.get_retry_time():
+                # the retries would not complete before the deadline, the request is sent once
+                if self._single_try_session is None:
+                    self._single_try_session = self._create_session(0)
+                    self._single_try_session.cookies = self.session.cookies
+                session = self._single_try_session
+        request_headers = dict(self._headers, Host=self._get_host(url))
+        if headers:
+            request_headers.update(headers)
+        xbmc.log(str(request_headers), xbmc.LOGDEBUG)
+        timeout = self._timeout
+        if max_timeout is not None:
+            timeout = tuple(min(t, max_timeout) for t in timeout)
+        return session.get(url, headers=request_headers, stream=stream, timeout=timeout)
+
+    @staticmethod
+    def _get_host(url):
+        return url.split("://")[1].split("/")[0]
 
     def _logout(self):
         if 'yandex_login' in self.session.cookies:
@@ -141,27 +278,20 @@ class User:
         headers = dict(self._headers)
         headers.update({'Sec-Fetch-Site': "none",
                         'Sec-Fetch-User': "?1"})
-        query_url = "https://%s/video" % self._site.api_host
-        self.get_http(query_url, headers=headers)
+        query_url = "%s/video" % self._site.liveapi_url
+        try:
+            self.session.get(query_url, headers=dict(headers, Host=self._get_host(query_url)), timeout=self._timeout)
+        except IOError as e:
+            xbmc.log("Client registration failed: %s" % e, xbmc.LOGWARNING)
 
     def _save_cookies(self):
-        with open(self._cookies_file, "wb") as f:
-            pickle.dump(self.session.cookies, f)
+        self._cookie_store.save(self.session.cookies)
 
     def _load_cookies(self):
-        if os.path.exists(self._cookies_file):
-            with open(self._cookies_file, 'rb') as f:
-                cj = pickle.load(f)
-                for c in cj:
-                    xbmc.log(str(c), xbmc.LOGDEBUG)
-                    self.session.cookies.set_cookie(c)
+        self._cookie_store.load(self.session.cookies)
 
     def _get_users(self):
-        if os.path.exists(self.users_file):
-            with open(self.users_file, "r") as f:
-                return json.load(f)
-        else:
-            return []
+        return statefile.load_json(self.users_file, [])
 
     def _get_user(self, yandex_login):
         if not self.user_data:
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Module: warmup
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+import time
+
+import xbmc
+
+# seconds without user input after which Kodi is considered idle
+IDLE_TIME = 300
+# cap of the interval growth after the failed cycles
+MAX_BACKOFF = 16
+# seconds between the checks of the Kodi shutdown while the artwork is downloaded
+ABORT_POLL = 0.5
+
+
+class WarmUp(object):
+    """
+    Refreshes the video feed, the most used saved searches and their artwork into the local caches while Kodi is
+    idle, so that the listings opened later are served from cache. Failed cycles double the interval. The cycle
+    stops as soon as Kodi is shutting down.
+    """
+
+    def __init__(self, site, monitor=None):
+        """
+        @param site: YandexZen
+        @param monitor: xbmc.Monitor of the service
+        """
+        self.site = site
+        self.monitor = monitor or xbmc.Monitor()
+        self.next_run = 0
+        self.failures = 0
+
+    def get_interval(self):
+        return int(self.site.addon.getSetting("warmup_interval") or 0) * 60
+
+    def get_budget(self):
+        return int(self.site.addon.getSetting("warmup_budget") or 0)
+
+    @staticmethod
+    def is_idle():
+        return xbmc.getGlobalIdleTime() >= IDLE_TIME and not xbmc.Player().isPlaying()
+
+    def tick(self):
+        """
+        Runs the cycle if it is due and Kodi is idle, call it periodically from the service loop
+        """
+        interval = self.get_interval()
+        if not interval or time.time() < self.next_run or not self.is_idle():
+            return
+
+        ok = self.run(self.get_budget())
+        self.failures = 0 if ok else self.failures + 1
+        self.next_run = time.time() + interval * min(2 ** self.failures, MAX_BACKOFF)
+        xbmc.log("Next warm-up in %s s" % int(self.next_run - time.time()), xbmc.LOGDEBUG)
+
+    def run(self, budget):
+        """
+        Refreshes the feeds one by one until the budget is spent or the user is back
+        @param budget: seconds the cycle may take
+        @return: False if any of the feeds has failed on the network or with an HTTP error
+        """
+        # imported here to keep the service startup light
+        import resources.lib.modules.news as news
+
+        deadline = time.monotonic() + budget
+        page = news.News(self.site)
+        failed_requests = self.site.failed_requests
+        for url in page.get_feed_urls():
+            if time.monotonic() >= deadline or not self.is_idle() or self.monitor.abortRequested():
+                xbmc.log("Warm-up interrupted", xbmc.LOGDEBUG)
+                break
+            xbmc.log("Warming up %s" % url, xbmc.LOGDEBUG)
+            # ttl 0 revalidates the cached response
+            data = self.site.request(url, output="json", ttl=0)
+            if self.site.failed_requests > failed_requests:
+                break
+            # a saved search can have no results
+            page.prefetch_artwork(data.get('items', []))
+
+        while not self.monitor.abortRequested():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.site.artwork.wait(timeout=min(remaining, ABORT_POLL)):
+                break
+        # the downloads are not waited for if Kodi is shutting down
+        self.site.artwork.close(wait=not self.monitor.abortRequested())
+        return self.site.failed_requests == failed_requests
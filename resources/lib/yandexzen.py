@@ -3,25 +3,44 @@
 # Author: Alex Bratchik
 # Created on: 03.04.2021
 # License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
-import inspect
+import hashlib
+import json
 import os
 import sys
+import time
 
 import xbmc
 import xbmcaddon
 
-from urllib.parse import parse_qsl
+from urllib.parse import parse_qsl, urlsplit
 from urllib.parse import quote as encode4url
 
 import xbmcvfs
 
 from resources.lib import kodiutils
-from importlib import import_module
+from resources.lib.artwork import ArtworkCache
+from resources.lib.cachestore import CacheStore
+from resources.lib.circuitbreaker import CircuitBreaker
+from resources.lib.httpcache import ResponseCache
+from resources.lib.localindex import LocalIndex
+from resources.lib.serviceclient import ServiceClient
+from resources.lib import modules
+from resources.lib import statefile
+from resources.lib import tracing
 
 ADDON_ID = "plugin.video.yandex.zen"
+SITE_URL = "https://dzen.ru"
+# number of the lock files the concurrent requests are coalesced with
+FLIGHT_LOCKS = 64
+# seconds to wait for the concurrent request of the url without the deadline of the invocation
+FLIGHT_WAIT = 30
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:101.0) Gecko/20100101 Firefox/101.0"
 
 
+class DeadlineExceeded(IOError):
+    pass
+
+
 class YandexZen:
     def __init__(self):
         self.id = ADDON_ID
@@ -29,22 +48,45 @@ class YandexZen:
         self.path = self.addon.getAddonInfo('path')
         self.media_path = os.path.join(self.path, "resources", "media")
         self.data_path = get_data_path(self.addon)
+        self.trace_file = os.path.join(self.data_path, "trace.jsonl")
+        if self.addon.getSetting("tracing") == "true":
+            tracing.enable(self.trace_file)
         self.history_path = kodiutils.create_folder(os.path.join(self.data_path, 'history'))
+        self.locks_path = kodiutils.create_folder(os.path.join(self.data_path, 'locks'))
+        self.cache_store = CacheStore(os.path.join(self.data_path, "cache.db"),
+                                      max_size=int(self.addon.getSetting("cache_size") or 0) * 1024 * 1024)
+        self.response_cache = ResponseCache(self.cache_store)
+        self.circuit = CircuitBreaker(self.cache_store)
+        # monotonic time after which the invocation does not query the site, None for no limit
+        self.deadline = None
+        self.artwork = ArtworkCache(os.path.join(self.data_path, "artwork"), USER_AGENT,
+                                    enabled=self.addon.getSetting("artwork_cache") != "false",
+                                    max_size=int(self.addon.getSetting("artwork_cache_size") or 0) * 1024 * 1024)
+        self.local_index = LocalIndex(os.path.join(self.data_path, "index.db"),
+                                      max_age=int(self.addon.getSetting("local_index_days") or 0) * 24 * 60 * 60)
+        self.stale_while_revalidate = self.addon.getSetting("stale_while_revalidate") != "false"
+        # urls of the responses served from cache after their ttl, to be revalidated after the listing is shown
+        self.stale_urls = []
+        # number of the requests failed on the network or with an HTTP error, including the ones failed fast
+        self.failed_requests = 0
 
         self.user = None
+        self.service = ServiceClient()
 
         self.url = sys.argv[0] if len(sys.argv) > 0 else ""
         self.handle = int(sys.argv[1]) if len(sys.argv) > 1 else 0
 
         self.params = {}
 
-        self.domain = "dzen.ru"
+        # the site url can be overridden to replay the recorded responses from a local server
+        site_url = urlsplit(self.addon.getSetting("site_url") or SITE_URL)
+        self.domain = site_url.netloc
         self.api_host = self.domain
         self.cdnapi_host = self.api_host
-        self.api_url = "https://%s/api/v3" % self.api_host
+        self.api_url = "%s://%s/api/v3" % (site_url.scheme, self.api_host)
         self.cdnapi_url = self.api_url
         self.liveapi_host = self.domain
-        self.liveapi_url = "https://%s" % self.liveapi_host
+        self.liveapi_url = "%s://%s" % (site_url.scheme, self.liveapi_host)
 
         self.language = self.addon.getLocalizedString
 
@@ -53,7 +95,7 @@ class YandexZen:
         self.action = "load"
         self.context_title = self.language(30300)
 
-    def show_to(self, user, context=""):
+    def show_to(self, user):
 
         self.user = user
 
@@ -61,6 +103,12 @@ class YandexZen:
         xbmc.log("Handle: %d" % self.handle, xbmc.LOGDEBUG)
         xbmc.log("User: %s" % user.yandex_login, xbmc.LOGDEBUG)
 
+        self.load_context_items()
+
+        # load items from self.context
+
+    def parse_params(self, context=""):
+
         if context:
             self.params = {'context': context}
             xbmc.log("Params ignored")
@@ -74,29 +122,242 @@ class YandexZen:
         xbmc.log("Context: %s" % self.context, xbmc.LOGDEBUG)
         xbmc.log("Action: %s" % self.action, xbmc.LOGDEBUG)
 
-        self.load_context_items()
+        budget = int(self.addon.getSetting("request_deadline") or 0)
+        self.deadline = time.monotonic() + budget if budget else None
 
-        # load items from self.context
+    def is_offline_action(self):
+        # widgets are served from cache, the session is opened on demand to refresh it after the listing is shown
+        return modules.is_offline_action(self.context, self.action) or self.is_widget()
+
+    def is_widget(self):
+        return self.params.get('widget', "") == "true"
 
     def load_context_items(self):
-        mod = import_module("resources.lib.modules.%s" % self.context)
-        classes = [cls for _, cls in inspect.getmembers(mod, inspect.isclass(mod))]
-        getattr(classes[0](self), self.action)()
+        page_class = modules.get_page_class(self.context)
+        getattr(page_class(self), self.action)()
 
-    def request(self, url, output="text", headers=None):
+    def request(self, url, output="text", headers=None, ttl=None, stale=False):
+        """
+        Queries the site
+        @param url: url to query
+        @param output: "json", "text" or "stream"
+        @param headers: optional request headers added to the session headers
+        @param ttl: seconds to serve the response from cache. None disables caching, 0 always revalidates
+        @param stale: serve the expired response from cache and leave it for revalidate
+        @return: decoded json, text or the response object for the stream output
+        """
         xbmc.log("Query site url: %s" % url, xbmc.LOGDEBUG)
         is_stream = (output == "stream")
-        response = self.user.get_http(url, headers=headers, stream=is_stream)
+        use_cache = ttl is not None and not is_stream
+
+        # taken before the cache lookup, a response stored by a concurrent request after it is shared below
+        started = time.time()
+        entry = self.response_cache.get(url) if use_cache else None
+        if entry:
+            if self.response_cache.is_fresh(entry, ttl):
+                xbmc.log("Response served from cache: %s" % url, xbmc.LOGDEBUG)
+                return self.decode_content(entry['content'], output)
+            # the widgets serve any cached response, also with the ttl of 0, not to block the home screen
+            if stale and (self.is_widget() or ttl and self.stale_while_revalidate):
+                xbmc.log("Stale response served from cache: %s" % url, xbmc.LOGDEBUG)
+                self.stale_urls.append(url)
+                return self.decode_content(entry['content'], output)
+            headers = dict(headers or {}, **self.response_cache.get_validators(entry))
+
+        if not is_stream and self.is_failing(url):
+            xbmc.log("Failing fast, the site has recently failed: %s" % url, xbmc.LOGDEBUG)
+            self.failed_requests += 1
+            return self.get_fallback(entry, output)
+
+        if not use_cache:
+            return self.query(url, output, headers)
+
+        with tracing.span("single_flight"), self.single_flight(url) as is_locked:
+            if not is_locked:
+                xbmc.log("Concurrent request of %s is late, querying without the lock" % url, xbmc.LOGWARNING)
+            # a concurrent request could have fetched the url while this one was waiting for the lock
+            shared = self.response_cache.get(url)
+            if shared and shared['time'] >= started:
+                xbmc.log("Response shared by a concurrent request: %s" % url, xbmc.LOGDEBUG)
+                return self.decode_content(shared['content'], output)
+            return self.query(url, output, headers, use_cache=True, entry=entry)
+
+    def query(self, url, output="text", headers=None, use_cache=False, entry=None):
+        """
+        Sends the request, see request
+        @param use_cache: store the response in the response cache
+        @param entry: cached response the request is conditional on
+        """
+        is_stream = (output == "stream")
+        try:
+            response = self.fetch(url, headers=headers, stream=is_stream)
+        except IOError as e:
+            # requests exceptions are derived from IOError
+            if is_stream:
+                raise
+            xbmc.log("Query %s failed: %s" % (url, e), xbmc.LOGERROR)
+            if not isinstance(e, DeadlineExceeded):
+                self.record_failure(url)
+            return self.get_fallback(entry, output)
+
+        if entry and response.status_code == 304:
+            xbmc.log("Cached response revalidated: %s" % url, xbmc.LOGDEBUG)
+            self.circuit.record_success(urlsplit(url).netloc)
+            self.response_cache.touch(url, entry)
+            return self.decode_content(entry['content'], output)
+
         err = response.status_code != 200
         if err:
             xbmc.log("Query %s returned HTTP error %s" % (url, response.status_code))
+            # status 0 is returned by the background service if the request has failed
+            self.record_failure(url, is_host_failure=response.status_code == 0 or response.status_code >= 500)
+            if not is_stream:
+                return self.get_fallback(entry, output)
+        else:
+            self.circuit.record_success(urlsplit(url).netloc)
+            if use_cache:
+                self.response_cache.put(url, response)
         if output == "json":
-            return {} if err else response.json()
+            with tracing.span("json_decode"):
+                return {} if err else response.json()
         elif output == "text":
             return "" if err else response.text
         else:
             return response
 
+    def is_failing(self, url):
+        """
+        @return: True if the host of the url is considered down or the url has recently failed
+        """
+        return self.circuit.is_open(urlsplit(url).netloc) or self.response_cache.is_failed(url)
+
+    def get_fallback(self, entry, output):
+        """
+        Returns the result of the request, which has failed or has not been sent
+        @param entry: cached response, possibly expired
+        @return: the cached content or an empty result
+        """
+        if entry:
+            xbmc.log("Serving the cached response instead", xbmc.LOGDEBUG)
+            return self.decode_content(entry['content'], output)
+        return {} if output == "json" else ""
+
+    def record_failure(self, url, is_host_failure=True):
+        """
+        Remembers the failed url and counts the failure of its host, notifies the user if the host is considered
+        down
+        @param is_host_failure: False if the site has responded, but the url is not available
+        """
+        self.failed_requests += 1
+        self.response_cache.mark_failed(url)
+        if is_host_failure and self.circuit.record_failure(urlsplit(url).netloc):
+            kodiutils.show_error_message(self.language(30620))
+
+    def single_flight(self, url):
+        """
+        Returns the lock serializing the requests of the url across the plugin processes. The urls are mapped to
+        a fixed number of lock files. The lock is waited for until the deadline of the invocation.
+        @return: context manager yielding False if the lock has not been taken in time
+        """
+        stripe = int(hashlib.sha1(self.response_cache.normalize_url(url).encode()).hexdigest(), 16) % FLIGHT_LOCKS
+        timeout = FLIGHT_WAIT if self.deadline is None else max(0, self.deadline - time.monotonic())
+        return statefile.locked(os.path.join(self.locks_path, "flight_%02d" % stripe), timeout=timeout)
+
+    def fetch(self, url, headers=None, stream=False):
+        """
+        Sends the request through the background service if it is running or the own session otherwise
+        @return: response object
+        @raise DeadlineExceeded: if the request has not completed before the deadline of the invocation
+        """
+        with tracing.span("http"):
+            try:
+                response = None
+                if self.service and not stream:
+                    response = self.service.get(url, headers=headers, timeout=self.get_remaining_time())
+                if response is None:
+                    response = self.user.get_http(url, headers=headers, stream=stream,
+                                                  max_timeout=self.get_remaining_time())
+                return response
+            except DeadlineExceeded:
+                raise
+            except IOError as e:
+                # the timeouts are shortened to the deadline, the request failing after it has been cut short by
+                # the invocation and it is not a failure of the site
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    raise DeadlineExceeded("Time limit of the invocation is exceeded: %s" % e)
+                raise
+
+    def get_remaining_time(self):
+        """
+        @return: seconds left until the deadline of the invocation, None if it has no deadline
+        @raise DeadlineExceeded: if the deadline has passed
+        """
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("Time limit of the invocation is exceeded")
+        return remaining
+
+    def revalidate(self):
+        """
+        Revalidates the responses served stale by this invocation
+        @return: True if any of them has changed
+        """
+        changed = False
+        urls, self.stale_urls = self.stale_urls, []
+        for url in urls:
+            entry = self.response_cache.get(url)
+            if entry is None:
+                continue
+            if self.is_failing(url):
+                xbmc.log("Revalidation of %s skipped, the site has recently failed" % url, xbmc.LOGDEBUG)
+                continue
+            # the failed revalidation returns the cached content, which is not a change
+            content = self.query(url, output="text", headers=self.response_cache.get_validators(entry),
+                                 use_cache=True, entry=entry)
+            changed = content != entry['content'] or changed
+        return changed
+
+    def request_many(self, urls, output="json", ttl=None, stale=False, max_workers=4, timeout=None):
+        """
+        Queries the urls in parallel
+        @param urls: list of urls to query
+        @param output: "json" or "text"
+        @param ttl: seconds to serve the responses from cache, see request
+        @param stale: serve the expired responses from cache and leave them for revalidate
+        @param max_workers: maximum number of the concurrent requests
+        @param timeout: seconds to wait for all results, None to wait without a limit
+        @return: list of the results in the order of urls, None for the ones not received in time
+        """
+        if len(urls) < 2 and timeout is None:
+            return [self.request(url, output=output, ttl=ttl, stale=stale) for url in urls]
+        # imported on demand to save the startup time of the actions querying a single url
+        from concurrent.futures import ThreadPoolExecutor, wait
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)))
+        futures = [executor.submit(self.request, url, output=output, ttl=ttl, stale=stale) for url in urls]
+        done, not_done = wait(futures, timeout=timeout)
+        # the late requests are not waited for, they still complete into the response cache
+        executor.shutdown(wait=False)
+        if not_done:
+            xbmc.log("%s of %s requests have not completed in %s s" % (len(not_done), len(urls), timeout),
+                     xbmc.LOGWARNING)
+        return [f.result() if f in done else None for f in futures]
+
+    @staticmethod
+    def decode_content(content, output):
+        if output == "json":
+            with tracing.span("json_decode"):
+                return json.loads(content)
+        return content
+
+    def close(self):
+        self.artwork.close()
+        self.cache_store.close()
+        self.local_index.close()
+        tracing.flush(self.context, self.action)
+
         # *** Add-on helpers
 
     def get_media(self, file_name):
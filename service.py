@@ -0,0 +1,19 @@
+# coding=utf-8
+# Module: service
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Background service for the Yandex Zen video plugin
+"""
+
+from resources.lib.yandexzen import YandexZen
+from resources.lib.users import User
+from resources.lib.httpservice import HttpService
+
+if __name__ == '__main__':
+    site = YandexZen()
+    # the service queries the site in-process
+    site.service = None
+
+    HttpService(site, User()).run()
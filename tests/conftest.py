@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Module: conftest
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+The tests run the plugin invocations with the benchmark harness, see benchmarks/harness.py, and import the addon
+modules with the stub xbmc modules of the benchmarks
+"""
+import os
+import sys
+
+import pytest
+
+ADDON_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ADDON_PATH, os.path.join(ADDON_PATH, "benchmarks", "stubs")]
+
+from benchmarks.replay_server import ReplayServer  # noqa: E402
+
+
+@pytest.fixture
+def replay():
+    with ReplayServer() as server:
+        yield server
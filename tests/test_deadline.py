@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Module: test_deadline
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+A request cut short by the time limit of the invocation is not a failure of the site, the url is queried again
+by the next invocation
+"""
+from benchmarks import harness
+
+# seconds the replay server takes to answer, the second feed page does not fit the time limit
+DELAY = 1.8
+
+
+def test_request_cut_by_deadline_is_not_failed(replay, tmp_path):
+    settings = {'site_url': replay.url, 'items_per_screen': "40", 'request_deadline': "5"}
+    replay.delay = DELAY
+    result = harness.invoke("?action=load&context=videos&content=videos", str(tmp_path), settings=settings)
+    next_url, label, is_folder = result['items'][-1]
+    assert is_folder and "load_url" in next_url
+
+    replay.delay = 0
+    result = harness.invoke(next_url[len(harness.PLUGIN_URL):], str(tmp_path), settings=settings)
+    assert len(result['items']) > 1
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Module: test_hls
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+The play action resolves the master playlist of the replay server, see benchmarks/fixtures/master.m3u8, to the
+variant stream of the quality settings
+"""
+import pytest
+
+from benchmarks import harness
+
+MASTER_PATH = "/video/more-0-00/master.m3u8"
+
+
+def play(replay, tmp_path, **settings):
+    result = harness.invoke("?action=play&context=videos&spath=%s%s" % (replay.url, MASTER_PATH), str(tmp_path),
+                            settings=dict(settings, site_url=replay.url))
+    assert len(result['resolved']) == 1
+    # the request headers follow the url for Kodi
+    return result['resolved'][0].split("|")[0]
+
+
+@pytest.mark.parametrize("settings, variant", [({'quality': "2"}, "720p.m3u8"),
+                                               ({'quality': "5"}, "360p.m3u8"),
+                                               ({'max_bandwidth': "1"}, "360p.m3u8"),
+                                               ({'quality': "1", 'max_bandwidth': "3"}, "720p.m3u8")])
+def test_variant_of_the_quality_is_played(replay, tmp_path, settings, variant):
+    assert play(replay, tmp_path, **settings) == "%s/video/more-0-00/%s" % (replay.url, variant)
+    assert replay.get_hits("/video/") == [MASTER_PATH]
+
+
+def test_auto_quality_plays_the_master_playlist(replay, tmp_path):
+    assert play(replay, tmp_path, quality="0") == replay.url + MASTER_PATH
+    assert replay.get_hits("/video/") == []
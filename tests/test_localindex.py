@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Module: test_localindex
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Search of the local index over the titles of the feed elements
+"""
+import pytest
+
+from resources.lib.localindex import LocalIndex, stem
+
+
+@pytest.fixture
+def index(tmp_path):
+    local_index = LocalIndex(str(tmp_path / "index.db"))
+    local_index.add([{'id': "1", 'title': "Главные новости дня"},
+                     {'id': "2", 'title': "Видео 0 &amp; <b>Дзен</b>"},
+                     {'id': "3", 'title': "Скорость света"},
+                     {'id': "4", 'title': "С радостью"}])
+    yield local_index
+    local_index.close()
+
+
+@pytest.mark.parametrize("words", [("новость", "новости", "новостей"),
+                                   ("скорость", "скорости"),
+                                   ("радость", "радостью"),
+                                   ("главный", "главные")])
+def test_word_forms_have_one_stem(words):
+    assert len(set(stem(word) for word in words)) == 1
+
+
+@pytest.mark.parametrize("query, ids", [("новость", ["1"]),
+                                        ("главная новость", ["1"]),
+                                        ("скорости", ["3"]),
+                                        ("радость", ["4"]),
+                                        ("дзен", ["2"]),
+                                        ("amp", []),
+                                        ("b", [])])
+def test_search(index, query, ids):
+    assert [element['id'] for element in index.search(query)] == ids
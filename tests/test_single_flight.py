@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Module: test_single_flight
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Concurrent plugin invocations requesting the same url must send a single request to the site
+"""
+import collections
+import time
+
+from benchmarks import harness
+from resources.lib import statefile
+
+INVOCATIONS = 8
+# seconds the replay server takes to answer, so that all the invocations request the feed while it is in flight
+DELAY = 1
+
+FEED_PATH = "/api/v3/launcher/video-more?country_code=ru"
+
+
+def test_concurrent_invocations_query_the_url_once(replay, tmp_path):
+    replay.delay = DELAY
+    processes = [harness.start("?action=load&context=videos&content=videos", str(tmp_path),
+                               settings={'site_url': replay.url})
+                 for _ in range(INVOCATIONS)]
+    results = [harness.finish(process) for process in processes]
+
+    assert all(len(result['items']) > 1 for result in results)
+    hits = collections.Counter(replay.get_hits("/api/"))
+    assert hits[FEED_PATH] == 1
+    # the next pages prefetched by all the invocations are coalesced as well
+    assert set(hits.values()) == {1}
+
+
+def test_lock_wait_is_limited(tmp_path):
+    path = str(tmp_path / "flight")
+    with statefile.locked(path) as is_locked:
+        assert is_locked
+        started = time.monotonic()
+        with statefile.locked(path, timeout=0.2) as is_late_locked:
+            assert not is_late_locked
+        assert 0.2 <= time.monotonic() - started < 1
+    with statefile.locked(path, timeout=0.2) as is_locked:
+        assert is_locked
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Module: test_statefile_stress
+# Author: Alex Bratchik
+# Created on: 18.10.2026
+# License: GPL v.3 https://www.gnu.org/copyleft/gpl.html
+"""
+Many plugin invocations updating the same state files at once must neither lose an update nor corrupt a file
+"""
+import glob
+import json
+import os
+import pickle
+
+from benchmarks import harness
+
+INVOCATIONS = 24
+
+
+def test_concurrent_searches_keep_the_state_files(replay, tmp_path):
+    profile = str(tmp_path)
+    keywords = ["keyword %02d" % i for i in range(INVOCATIONS)]
+
+    processes = [harness.start("?action=search&context=videos&content=videos", profile,
+                               settings={'site_url': replay.url}, keyboard=keyword)
+                 for keyword in keywords]
+    results = [harness.finish(process) for process in processes]
+
+    # every invocation has saved its keyword and switched to its search listing
+    assert all(any(keyword.replace(" ", "+") in builtin for builtin in result['builtins'])
+               for keyword, result in zip(keywords, results))
+
+    data_path = os.path.join(profile, "data")
+    with open(os.path.join(data_path, "search_history.json"), encoding="utf-8") as f:
+        history = json.load(f)
+    assert sorted(element['title'] for element in history) == keywords
+    assert len(set(element['id'] for element in history)) == INVOCATIONS
+
+    # the cookie jar is readable by the next invocation
+    with open(os.path.join(data_path, "cookies.dat"), 'rb') as f:
+        assert "_yasc" in [cookie.name for cookie in pickle.load(f)]
+
+    assert not glob.glob(os.path.join(data_path, "**", "*.corrupt"), recursive=True)
+    assert not glob.glob(os.path.join(data_path, "**", "*.tmp"), recursive=True)